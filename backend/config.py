@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -12,6 +13,42 @@ class Settings(BaseSettings):
     DATABASE_PATH: str = "workflows.db"
     DATA_DB_PATH: str = "application_data.db"
     DEFAULT_MODEL: str = "gpt-4o-mini"
+    # Root log level, e.g. "WARNING" in production to skip the per-step INFO logging.
+    LOG_LEVEL: str = "INFO"
+
+    # Deterministic (temperature 0) LLM completions kept in the in-memory cache. 0 disables caching.
+    LLM_CACHE_SIZE: int = 1024
+
+    # Condition checks read a single TRUE/FALSE token's logprobs instead of generating reasoning.
+    # Set to False to get the reasoning-then-answer prompt back, e.g. while debugging a condition.
+    CONDITION_CHECK_LOGPROBS: bool = True
+
+    # Branches of a parallel_group step that may run at the same time, to stay within provider rate limits.
+    PARALLEL_GROUP_MAX_CONCURRENCY: int = 10
+
+    # Reuse an agentic step's earlier tool call when a new prompt's embedding reaches this cosine
+    # similarity to a past one (e.g. 0.95). Costs one embedding call per step; None disables it.
+    TOOL_CALL_CACHE_SIMILARITY: Optional[float] = None
+    TOOL_CALL_CACHE_EMBEDDING_MODEL: str = "text-embedding-3-small"
+
+    # Step history entries kept per execution. Older entries are dropped (and removed from the
+    # stored history of paused executions) so long-running loops have bounded memory.
+    STEP_HISTORY_LIMIT: int = 1000
+    # Only the newest entries keep their full output; older ones are cut to STEP_HISTORY_COMPACT_CHARS.
+    STEP_HISTORY_FULL_ENTRIES: int = 20
+    STEP_HISTORY_COMPACT_CHARS: int = 500
+
+    # Connection pool for the shared OpenAI client. Keep-alive connections are reused across
+    # LLM and embedding calls; HTTP/2 is used when the optional 'h2' package is installed.
+    OPENAI_MAX_CONNECTIONS: int = 64
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 64
+    # Seconds before an OpenAI request (or opening a connection for one) is abandoned. A dead
+    # connection fails fast instead of holding a pooled slot for the SDK's 10 minute default.
+    OPENAI_TIMEOUT: float = 60.0
+    OPENAI_CONNECT_TIMEOUT: float = 5.0
+    # Retries of an OpenAI call after a rate limit, timeout, connection error or 5xx response.
+    # The SDK backs off exponentially with jitter and honors the Retry-After header.
+    OPENAI_MAX_RETRIES: int = 5
 
     # Define directories relative to the backend root
     BACKEND_ROOT: str = os.path.dirname(__file__)
@@ -19,7 +56,12 @@ class Settings(BaseSettings):
     TOOL_CUSTOM_DIR: str = os.path.join(BACKEND_ROOT, 'tools', 'custom')
 
     VECTOR_STORE_DIR: str = "vector_stores"
+    # Threads FAISS may use for a search. Defaults to all available cores.
+    FAISS_THREADS: Optional[int] = None
     FILE_ATTACHMENT_DIR: str = "file_attachments"
+    # Extra tesseract options for image OCR, e.g. "--oem 1 --psm 6" for the faster LSTM engine
+    # on single-block text. Empty keeps tesseract's defaults.
+    TESSERACT_CONFIG: str = ""
 
     # Pydantic-settings model configuration
     model_config = SettingsConfigDict(
@@ -1,10 +1,12 @@
 import logging
 import sys
 
+from ..config import settings
+
 # Configure logging as soon as the package is imported.
 # This ensures all modules get the same configuration.
 logging.basicConfig(
-    level=logging.INFO,
+    level=settings.LOG_LEVEL.upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     stream=sys.stdout  # Explicitly log to standard output.
 )
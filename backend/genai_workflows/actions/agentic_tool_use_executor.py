@@ -1,29 +1,36 @@
-import json
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
-from .base_executor import BaseActionExecutor
+from .base_executor import BaseActionExecutor, _loads
 from ..workflow import WorkflowStep
 from ...config import settings
 
 logger = logging.getLogger(__name__)
 
+_SYS_MSG_BASE = "You are an assistant that must achieve a goal. Analyze the user's query and the goal."
+# The complete system message for each tool_selection mode, built once.
+_SYS_MSG = {
+    "auto": _SYS_MSG_BASE + " You can use any of the available tools to help you.",
+    "manual": _SYS_MSG_BASE + " You must use one of the specifically provided tools to achieve your goal.",
+    "none": _SYS_MSG_BASE + " You must respond directly without using any tools.",
+}
+
 class AgenticToolUseAction(BaseActionExecutor):
     async def execute(self, step: WorkflowStep, state: Dict[str, Any]) -> Dict[str, Any]:
         llm_input = self._prepare_llm_input(step, state)
         final_prompt = llm_input["final_prompt"]
 
-        system_message = "You are an assistant that must achieve a goal. Analyze the user's query and the goal."
+        system_message = _SYS_MSG_BASE
         available_tools: List[Dict[str, Any]] = []
 
         if step.tool_selection == 'auto':
-            system_message += " You can use any of the available tools to help you."
+            system_message = _SYS_MSG["auto"]
             available_tools = self.tool_registry.list_tools()
         elif step.tool_selection == 'manual' and step.tool_names:
-            system_message += " You must use one of the specifically provided tools to achieve your goal."
+            system_message = _SYS_MSG["manual"]
             available_tools = self.tool_registry.get_tools_by_names(step.tool_names)
         elif step.tool_selection == 'none':
-            system_message += " You must respond directly without using any tools."
+            system_message = _SYS_MSG["none"]
 
         messages = [{"role": "system", "content": system_message}, {"role": "user", "content": final_prompt}]
         model = step.model_name or settings.DEFAULT_MODEL
@@ -33,19 +40,27 @@ class AgenticToolUseAction(BaseActionExecutor):
             completion_kwargs["tool_choice"] = "auto"
 
         try:
+            tool_names = tuple(sorted(tool["name"] for tool in available_tools))
+            prompt_embedding = None
+            if available_tools and settings.TOOL_CALL_CACHE_SIMILARITY is not None:
+                prompt_embedding = await self._embed_prompt(final_prompt)
+                cached = prompt_embedding and self.engine.tool_call_cache.lookup(tool_names, prompt_embedding, settings.TOOL_CALL_CACHE_SIMILARITY)
+                if cached:
+                    logger.info("Step '%s' reusing cached tool choice '%s' for a near-identical prompt.", step.step_id, cached[0])
+                    return self._call_tool(step, *cached)
+
             response = await self.client.chat.completions.create(**completion_kwargs)
             response_message = response.choices[0].message
 
             if response_message.tool_calls:
                 tool_call = response_message.tool_calls[0]
-                tool_name = tool_call.function.name
-                tool_func = self.tool_registry.get_tool(tool_name)
-                if not tool_func:
-                    return {"step_id": step.step_id, "success": False, "error": f"Tool '{tool_name}' not found."}
-
-                tool_args = json.loads(tool_call.function.arguments)
-                tool_result = tool_func(**tool_args)
-                return {"step_id": step.step_id, "success": True, "type": "tool_call", "tool_name": tool_name, "tool_args": tool_args, "output": tool_result}
+                # Arguments arrive as a JSON string; parse them once (and never re-parse a dict).
+                arguments = tool_call.function.arguments
+                tool_args = arguments if isinstance(arguments, dict) else _loads(arguments)
+                result = self._call_tool(step, tool_call.function.name, tool_args)
+                if prompt_embedding and result["success"]:
+                    self.engine.tool_call_cache.add(tool_names, prompt_embedding, tool_call.function.name, tool_args)
+                return result
 
             if step.tool_selection in ['auto', 'manual']:
                 error_msg = "Agent failed to select a required tool. The prompt may be missing context or is too vague."
@@ -54,5 +69,21 @@ class AgenticToolUseAction(BaseActionExecutor):
             llm_output = response_message.content
             return {"step_id": step.step_id, "success": True, "type": "llm_response", "output": llm_output}
         except Exception as e:
-            logger.error(f"Agentic tool use step '{step.step_id}' failed: {e}", exc_info=True)
-            return {"step_id": step.step_id, "success": False, "error": str(e)}
\ No newline at end of file
+            logger.error("Agentic tool use step '%s' failed: %s", step.step_id, e, exc_info=True)
+            return {"step_id": step.step_id, "success": False, "error": str(e)}
+
+    def _call_tool(self, step: WorkflowStep, tool_name: str, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+        tool_func = self.tool_registry.get_tool(tool_name)
+        if not tool_func:
+            return {"step_id": step.step_id, "success": False, "error": f"Tool '{tool_name}' not found."}
+        tool_result = tool_func(**tool_args)
+        return {"step_id": step.step_id, "success": True, "type": "tool_call", "tool_name": tool_name, "tool_args": tool_args, "output": tool_result}
+
+    async def _embed_prompt(self, prompt: str) -> Optional[List[float]]:
+        """Embeds the prompt for the tool-call cache. A failure only disables the cache for this step."""
+        try:
+            response = await self.client.embeddings.create(input=[prompt], model=settings.TOOL_CALL_CACHE_EMBEDDING_MODEL)
+            return response.data[0].embedding
+        except Exception as e:
+            logger.warning("Could not embed prompt for the tool-call cache: %s", e)
+            return None
\ No newline at end of file
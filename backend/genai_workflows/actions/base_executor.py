@@ -1,14 +1,58 @@
 import re
 import json
 import os
+from contextvars import ContextVar
+from functools import lru_cache
 from abc import ABC, abstractmethod
-from typing import Dict, Any, TYPE_CHECKING, List, Union
+from typing import Callable, Dict, Any, Optional, TYPE_CHECKING, List, Union
+
+from ..serialization import _dumps, _loads
 
 if TYPE_CHECKING:
     from ..core import WorkflowEngine
     from ...tools import ToolRegistry
     from ..workflow import WorkflowStep
 
+# Static scaffold for prompts that get the recent history injected as context.
+# Only the (bounded) context block is serialized per call.
+CONTEXTUAL_PROMPT_TEMPLATE = """Based on the following context, complete the request.
+---
+CONTEXT:
+{context}
+---
+REQUEST: {request}"""
+
+# Longest output (or error) quoted per history entry in a prompt; longer values are cut with a marker.
+PROMPT_VALUE_MAX_CHARS = 2000
+
+# Receives generated text as it streams in, for the execution currently running in this context.
+# Set by WorkflowExecutor.execute; a context variable because one executor serves many executions
+# concurrently and the execution state itself must stay JSON-serializable.
+stream_callback: ContextVar[Optional[Callable[[str], None]]] = ContextVar("stream_callback", default=None)
+
+# Splits a single placeholder such as '{input.files}' into its source and key. Compiled once since it
+# runs for every placeholder resolved, including once per item for nodes inside loops.
+_STATE_REFERENCE_RE = re.compile(r'\{(state|context|input|env)\.(.+?)}')
+
+# Finds every placeholder embedded in a prompt template. Groups are (source, key), both None for '{query}'.
+_PLACEHOLDER_RE = re.compile(r'\{(?:(state|context|input|env)\.([a-zA-Z0-9_]+_?)|query)\}')
+
+@lru_cache(maxsize=256)
+def _parse_json_template(template_str: str) -> Any:
+    """
+    Parses a JSON template once per distinct template string. Steps inside loops fill the
+    same template on every iteration, so only the placeholder substitution is repeated.
+    The parsed object is shared and must never be mutated; _recursive_fill builds new containers.
+    """
+    return json.loads(template_str)
+
+def _truncate_for_prompt(value: Any, max_chars: int = PROMPT_VALUE_MAX_CHARS) -> Any:
+    """Returns value unchanged if its text fits in max_chars, otherwise its text cut to max_chars."""
+    text = value if isinstance(value, str) else _dumps(value)
+    if len(text) <= max_chars:
+        return value
+    return text[:max_chars] + "[...truncated]"
+
 class BaseActionExecutor(ABC):
     """
     Abstract base class for all action executors.
@@ -20,8 +64,12 @@ class BaseActionExecutor(ABC):
         self.engine = engine
 
     @abstractmethod
-    async def execute(self, step: 'WorkflowStep', state: Dict[str, Any]) -> Dict[str, Any]:
-        """Executes the logic for a specific workflow step."""
+    def execute(self, step: 'WorkflowStep', state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Executes the logic for a specific workflow step.
+        Implementations that do I/O should be 'async def'; executors that only build a
+        result (e.g. pause signals) may be plain functions and skip the coroutine overhead.
+        """
         pass
 
     def _get_value_from_state(self, placeholder: str, state: Dict[str, Any]) -> Any:
@@ -29,14 +77,17 @@ class BaseActionExecutor(ABC):
         Helper to retrieve a value from state based on a placeholder string like '{input.var_name}'.
         """
         # This regex now correctly captures the source and the key as two separate groups.
-        match = re.match(r'\{(state|context|input|env)\.(.+?)}', placeholder.strip())
+        match = _STATE_REFERENCE_RE.match(placeholder.strip())
         if not match:
             if placeholder.strip() == "{query}":
                 return state.get("query")
             return None # Not a recognized placeholder format
 
-        source, key = match.groups()
+        return self._lookup(state, *match.groups())
 
+    @staticmethod
+    def _lookup(state: Dict[str, Any], source: str, key: str) -> Any:
+        """Resolves a placeholder that has already been split into its source and key."""
         if source == 'state':
             return state.get(key)
         if source == 'context':
@@ -71,7 +122,7 @@ class BaseActionExecutor(ABC):
             return {}
         try:
             # The _recursive_fill will handle all template replacements now.
-            template_obj = json.loads(template_str)
+            template_obj = _parse_json_template(template_str)
             return self._recursive_fill(template_obj, state)
         except json.JSONDecodeError:
             # This handles the case where the entire template_str is a single placeholder
@@ -91,13 +142,13 @@ class BaseActionExecutor(ABC):
         """
         if not template:
             return ""
-
-        # The regex to find all valid placeholders
-        placeholder_regex = r'\{(?:state|context|input|env)\.[a-zA-Z0-9_]+_?\}|\{query\}'
+        # Most templates are static text; without a brace there is nothing to substitute.
+        if "{" not in template:
+            return template
 
         def replace_match(match):
-            placeholder = match.group(0)
-            value = self._get_value_from_state(placeholder, state)
+            source, key = match.groups()
+            value = self._lookup(state, source, key) if source else state.get("query")
 
             # If a placeholder's value is not found or is None, replace it with an empty string
             # to avoid 'None' appearing in the final string.
@@ -107,14 +158,14 @@ class BaseActionExecutor(ABC):
             # If the value is a complex type (not a string), represent it as a JSON string.
             # This is important for cases where a whole dict might be injected into a larger string.
             if not isinstance(value, str):
-                return json.dumps(value, default=str)
+                return _dumps(value)
 
             # If it's a simple string, return it directly.
             return value
 
         # Check if the entire template is just one placeholder.
         # This is important to correctly return non-string types without converting them to JSON.
-        if re.fullmatch(placeholder_regex, template.strip()):
+        if _PLACEHOLDER_RE.fullmatch(template.strip()):
             value = self._get_value_from_state(template, state)
             # --- Return value directly if it is not None, otherwise return the original template ---
             # This correctly handles cases where the value is False, 0, or an empty string.
@@ -122,7 +173,7 @@ class BaseActionExecutor(ABC):
 
         # If we are here, the template is a string with embedded placeholders.
         # We use re.sub to replace all occurrences.
-        return re.sub(placeholder_regex, replace_match, template)
+        return _PLACEHOLDER_RE.sub(replace_match, template)
 
     def _fill_prompt_template_with_tracking(self, template: str, state: Dict[str, Any]) -> tuple[str, bool]:
         """
@@ -136,30 +187,32 @@ class BaseActionExecutor(ABC):
         """
         if not template:
             return "", False
+        if "{" not in template:
+            return template, False
 
         substitutions_made = [False] # Use a list to allow modification in nested scope
-        placeholder_regex = r'\{(?:state|context|input|env)\.[a-zA-Z0-9_]+_?\}|\{query\}'
 
         def replace_match(match):
             placeholder = match.group(0)
-            value = self._get_value_from_state(placeholder, state)
+            source, key = match.groups()
+            value = self._lookup(state, source, key) if source else state.get("query")
 
             if value is not None:
                 substitutions_made[0] = True
                 if not isinstance(value, str):
-                    return json.dumps(value, default=str)
+                    return _dumps(value)
                 return value
 
             return placeholder
 
-        if re.fullmatch(placeholder_regex, template.strip()):
+        if _PLACEHOLDER_RE.fullmatch(template.strip()):
             value = self._get_value_from_state(template, state)
             if value is not None:
                 return str(value), True
             else:
                 return template, False
 
-        filled_template = re.sub(placeholder_regex, replace_match, template)
+        filled_template = _PLACEHOLDER_RE.sub(replace_match, template)
 
         if filled_template == template and not substitutions_made[0]:
             return filled_template, False
@@ -173,9 +226,34 @@ class BaseActionExecutor(ABC):
         """
         history = state.get("step_history", [])
         relevant_items = [{"step_id": "start", "type": "query", "output": state.get("query")}]
-        relevant_items.extend(history[-3:]) # Get last 3 items
+        relevant_items.extend(self._project_history_entry(entry) for entry in history[-3:]) # Get last 3 items
         return relevant_items
 
+    @staticmethod
+    def _project_history_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Keeps only what a prompt needs from a history entry: its step, type, outcome and (truncated) result."""
+        projected = {"step_id": entry.get("step_id"), "type": entry.get("type"), "success": entry.get("success")}
+        if "output" in entry:
+            projected["output"] = _truncate_for_prompt(entry["output"])
+        if "error" in entry:
+            projected["error"] = _truncate_for_prompt(entry["error"])
+        return projected
+
+    def _project_history(self, state: Dict[str, Any], max_chars: int) -> List[Dict[str, Any]]:
+        """
+        The newest history entries, projected with _project_history_entry, that fit in max_chars
+        of JSON. Older entries are left out.
+        """
+        projected, used = [], 0
+        for entry in reversed(state.get("step_history", [])):
+            item = self._project_history_entry(entry)
+            used += len(_dumps(item))
+            if used > max_chars:
+                break
+            projected.append(item)
+        projected.reverse()
+        return projected
+
 
     def _prepare_llm_input(self, step: 'WorkflowStep', state: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -189,10 +267,8 @@ class BaseActionExecutor(ABC):
             return {"final_prompt": filled_prompt}
         else:
             context_history = self._get_relevant_history(state)
-            contextual_prompt = f"""Based on the following context, complete the request.
----
-CONTEXT:
-{json.dumps(context_history, indent=2, default=str)}
----
-REQUEST: {prompt_template}"""
+            contextual_prompt = CONTEXTUAL_PROMPT_TEMPLATE.format(
+                context=_dumps(context_history, indent=True),
+                request=prompt_template,
+            )
             return {"final_prompt": contextual_prompt}
\ No newline at end of file
@@ -1,45 +1,110 @@
-import json
 import logging
+import math
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Set
 
-from .base_executor import BaseActionExecutor
+import openai
+
+from .base_executor import BaseActionExecutor, _dumps, _truncate_for_prompt
 from ..workflow import WorkflowStep
 from ...config import settings
 
 logger = logging.getLogger(__name__)
 
-class ConditionCheckAction(BaseActionExecutor):
-    async def execute(self, step: WorkflowStep, state: Dict[str, Any]) -> Dict[str, Any]:
-        llm_input = self._prepare_llm_input(step, state)
-        prompt = f"""
+# Character budget for the step history quoted in a condition prompt; the newest steps are kept.
+CONDITION_HISTORY_MAX_CHARS = 24_000
+
+# The model's verdict, and the fallback when it did not use the tag. Compiled once; every condition check parses one.
+_FINAL_ANSWER_RE = re.compile(r'<final_answer>\s*(TRUE|FALSE)\s*</final_answer>', re.IGNORECASE)
+_TRUE_RE = re.compile(r'\bTRUE\b', re.IGNORECASE)
+
+# The task section of the prompt for each mode: a one-token verdict read from logprobs, or the
+# reasoning-then-tagged-answer form (slower, but shows why a condition was decided).
+_VERDICT_TASK = """**Your Task:**
+        Evaluate the condition based on the history and context. Answer with a single word: TRUE or FALSE."""
+_REASONING_TASK = """**Your Task:**
+        1. Carefully read the history and context.
+        2. Evaluate the condition based on the provided information.
+        3. Provide your reasoning in a <reasoning> XML tag.
+        4. Provide your final answer in a <final_answer> XML tag. The answer must be ONLY the word TRUE or FALSE."""
+
+
+def _verdict_from_logprobs(response) -> str:
+    """
+    Reads a one-token TRUE/FALSE answer from its top logprobs, summing every spelling of each
+    (' True', 'TRUE', ...). Falls back to the generated token if neither is more likely.
+    """
+    choice = response.choices[0]
+    probabilities = {"TRUE": 0.0, "FALSE": 0.0}
+    if choice.logprobs and choice.logprobs.content:
+        for candidate in choice.logprobs.content[0].top_logprobs:
+            word = candidate.token.strip().upper()
+            if word in probabilities:
+                probabilities[word] += math.exp(candidate.logprob)
+    if probabilities["TRUE"] == probabilities["FALSE"]:
+        return "TRUE" if _TRUE_RE.search(choice.message.content or "") else "FALSE"
+    return "TRUE" if probabilities["TRUE"] > probabilities["FALSE"] else "FALSE"
+
+# Models whose API rejected the logprobs request; their condition checks go straight to the reasoning prompt.
+_MODELS_WITHOUT_LOGPROBS: Set[str] = set()
+
+CONDITION_PROMPT_TEMPLATE = """
         Analyze the following execution history and context to determine if a specific condition is met.
         **Execution History & Context:**
         ---
-        {json.dumps(state, indent=2, default=str)}
+        {context}
         ---
         **Condition to Evaluate:**
-        "{llm_input["final_prompt"]}"
-        **Your Task:**
-        1. Carefully read the history and context.
-        2. Evaluate the condition based on the provided information.
-        3. Provide your reasoning in a <reasoning> XML tag.
-        4. Provide your final answer in a <final_answer> XML tag. The answer must be ONLY the word TRUE or FALSE.
+        "{condition}"
+        {task}
         """
+
+def _rejects_logprobs(error: openai.BadRequestError) -> bool:
+    """Whether a 400 response is the API refusing the logprobs parameters themselves."""
+    return error.param in ("logprobs", "top_logprobs") or "logprobs" in str(error.message).lower()
+
+class ConditionCheckAction(BaseActionExecutor):
+    async def execute(self, step: WorkflowStep, state: Dict[str, Any]) -> Dict[str, Any]:
+        llm_input = self._prepare_llm_input(step, state)
+        # Only what a condition can depend on, with long values cut, instead of the whole state.
+        context = {
+            "query": state.get("query"),
+            "initial_context": {k: _truncate_for_prompt(v) for k, v in (state.get("initial_context") or {}).items()},
+            "collected_inputs": {k: _truncate_for_prompt(v) for k, v in state.get("collected_inputs", {}).items()},
+            "step_history": self._project_history(state, CONDITION_HISTORY_MAX_CHARS),
+        }
+        context_json = _dumps(context, indent=True)
         try:
             model = step.model_name or settings.DEFAULT_MODEL
-            response = await self.client.chat.completions.create(model=model, messages=[{"role": "user", "content": prompt}], temperature=0.0)
-            result_text = response.choices[0].message.content
-            match = re.search(r'<final_answer>\s*(TRUE|FALSE)\s*</final_answer>', result_text, re.IGNORECASE)
+            if settings.CONDITION_CHECK_LOGPROBS and model not in _MODELS_WITHOUT_LOGPROBS:
+                prompt = CONDITION_PROMPT_TEMPLATE.format(context=context_json, condition=llm_input["final_prompt"], task=_VERDICT_TASK)
+                try:
+                    verdict = await self.engine.llm_cache.complete(
+                        self.client, model=model, messages=[{"role": "user", "content": prompt}], temperature=0.0,
+                        extract=_verdict_from_logprobs, max_tokens=1, logprobs=True, top_logprobs=5,
+                    )
+                    is_true = verdict == "TRUE"
+                    logger.info("Condition '%s' evaluated to: %s", step.prompt_template, is_true)
+                    return {"step_id": step.step_id, "success": is_true, "type": "condition_check", "output": is_true}
+                except openai.APIError as e:
+                    if isinstance(e, openai.BadRequestError):
+                        if not _rejects_logprobs(e):
+                            raise  # e.g. context length or content policy; retrying without logprobs would not help
+                        _MODELS_WITHOUT_LOGPROBS.add(model)
+                    logger.warning("Logprobs condition check failed for model '%s' (%s); falling back to the reasoning prompt.", model, e)
+
+            prompt = CONDITION_PROMPT_TEMPLATE.format(context=context_json, condition=llm_input["final_prompt"], task=_REASONING_TASK)
+            result_text = await self.engine.llm_cache.complete(self.client, model=model, messages=[{"role": "user", "content": prompt}], temperature=0.0)
+            match = _FINAL_ANSWER_RE.search(result_text)
 
             if not match:
-                is_true = "TRUE" in result_text.upper()
-                logger.warning(f"Could not find <final_answer> tag in condition check. Falling back to simple string search. Result: {is_true}")
+                is_true = _TRUE_RE.search(result_text) is not None
+                logger.warning("Could not find <final_answer> tag in condition check. Falling back to simple string search. Result: %s", is_true)
             else:
                 is_true = match.group(1).upper() == 'TRUE'
 
-            logger.info(f"Condition '{step.prompt_template}' evaluated to: {is_true}")
+            logger.info("Condition '%s' evaluated to: %s", step.prompt_template, is_true)
             return {"step_id": step.step_id, "success": is_true, "type": "condition_check", "output": is_true}
         except Exception as e:
-            logger.error(f"Condition check step '{step.step_id}' failed: {e}", exc_info=True)
+            logger.error("Condition check step '%s' failed: %s", step.step_id, e, exc_info=True)
             return {"step_id": step.step_id, "success": False, "error": str(e)}
\ No newline at end of file
@@ -1,4 +1,6 @@
+import asyncio
 import logging
+import threading
 from typing import Dict, Any
 
 from .base_executor import BaseActionExecutor
@@ -12,6 +14,25 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+CROSS_ENCODER_MODEL = 'cross-encoder/ms-marco-MiniLM-L-6-v2'
+
+# The model takes seconds to load, so it is loaded on first use and shared by every rerank step.
+_model = None
+_model_lock = threading.Lock()
+
+
+def _get_model():
+    global _model
+    with _model_lock:
+        if _model is None:
+            logger.info(f"Loading cross-encoder model '{CROSS_ENCODER_MODEL}'.")
+            _model = CrossEncoder(CROSS_ENCODER_MODEL)
+    return _model
+
+
+def _score(query: str, docs):
+    return _get_model().predict([[query, doc] for doc in docs])
+
 class CrossEncoderRerankAction(BaseActionExecutor):
     async def execute(self, step: WorkflowStep, state: Dict[str, Any]) -> Dict[str, Any]:
         """Re-ranks retrieved documents using a cross-encoder model for better relevance."""
@@ -41,9 +62,8 @@ class CrossEncoderRerankAction(BaseActionExecutor):
             if not isinstance(retrieved_docs, list) or not all(isinstance(doc, str) for doc in retrieved_docs):
                 return {"step_id": step.step_id, "success": False, "error": "The 'retrieved_docs' key must contain a list of strings."}
 
-            model = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2')
-            sentence_pairs = [[query, doc] for doc in retrieved_docs]
-            scores = model.predict(sentence_pairs)
+            # Loading and inference are CPU-bound, so they run on a worker thread.
+            scores = await asyncio.to_thread(_score, query, retrieved_docs)
 
             scored_docs = list(zip(scores, retrieved_docs))
             scored_docs.sort(key=lambda x: x[0], reverse=True)
@@ -4,7 +4,7 @@ from typing import Dict, Any, TYPE_CHECKING
 
 from .base_executor import BaseActionExecutor
 from ..workflow import WorkflowStep
-from ..database_manager import DatabaseManager
+from ..database_manager import AsyncDatabaseManager
 
 if TYPE_CHECKING:
     from ...tools import ToolRegistry
@@ -12,12 +12,16 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# A placeholder like {input.var} or {query}, plus any single/double quotes around it. Compiled once
+# instead of on every query.
+_QUOTED_PLACEHOLDER_RE = re.compile(r"""['"]?(\{(?:state|context|input|env)\.[a-zA-Z0-9_]+?\}|\{query\})['"]?""")
+
 class DatabaseQueryAction(BaseActionExecutor):
     """Executes a database SELECT query."""
 
     def __init__(self, openai_client, tool_registry: 'ToolRegistry', engine: 'WorkflowEngine'):
         super().__init__(openai_client, tool_registry, engine)
-        self.db_manager = DatabaseManager()
+        self.db_manager = AsyncDatabaseManager()
 
     async def execute(self, step: WorkflowStep, state: Dict[str, Any]) -> Dict[str, Any]:
         logger.info(f"Executing database_query step '{step.step_id}'.")
@@ -27,23 +31,19 @@ class DatabaseQueryAction(BaseActionExecutor):
             return {"step_id": step.step_id, "success": False, "error": "Database Query node is missing 'query_template'."}
 
         try:
-            # 1. Define the core pattern for finding placeholders like {input.var}
-            core_placeholder_pattern = r'\{(?:state|context|input|env)\.[a-zA-Z0-9_]+?\}|\{query\}'
-
-            # 2. Find all placeholders to get their corresponding values for the params tuple
-            placeholders_to_fill = re.findall(core_placeholder_pattern, query_template)
-            params = tuple(self._get_value_from_state(p, state) for p in placeholders_to_fill)
+            # 1. Replace each placeholder, together with any quotes around it (this is what prevents
+            # the ... = '?' error), with a single '?', collecting its value for the params tuple in
+            # the same pass so the template is scanned only once.
+            params = []
 
-            # 3. Define a new, more robust pattern for substitution.
-            # This pattern finds the placeholder AND any surrounding single/double quotes.
-            # This is what prevents the ... = '?' error.
-            substitution_pattern = rf"['\"]?({core_placeholder_pattern})['\"]?"
+            def to_parameter(match):
+                params.append(self._get_value_from_state(match.group(1), state))
+                return '?'
 
-            # 4. Replace the full pattern (e.g., '{input.var}') with a single '?'
-            sanitized_query = re.sub(substitution_pattern, '?', query_template)
+            sanitized_query = _QUOTED_PLACEHOLDER_RE.sub(to_parameter, query_template)
 
-            # 5. Execute the sanitized query with safe parameters
-            query_results = self.db_manager.execute_query(sanitized_query, params)
+            # 2. Execute the sanitized query with safe parameters
+            query_results = await self.db_manager.execute_query(sanitized_query, tuple(params))
 
             logger.info(f"Database query for step '{step.step_id}' returned {len(query_results)} rows.")
 
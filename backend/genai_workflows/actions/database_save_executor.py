@@ -3,7 +3,7 @@ from typing import Dict, Any, TYPE_CHECKING
 
 from .base_executor import BaseActionExecutor
 from ..workflow import WorkflowStep
-from ..database_manager import DatabaseManager
+from ..database_manager import AsyncDatabaseManager
 
 if TYPE_CHECKING:
     from ...tools import ToolRegistry
@@ -16,7 +16,7 @@ class DatabaseSaveAction(BaseActionExecutor):
 
     def __init__(self, openai_client, tool_registry: 'ToolRegistry', engine: 'WorkflowEngine'):
         super().__init__(openai_client, tool_registry, engine)
-        self.db_manager = DatabaseManager()
+        self.db_manager = AsyncDatabaseManager()
 
     async def execute(self, step: WorkflowStep, state: Dict[str, Any]) -> Dict[str, Any]:
         logger.info(f"Executing database_save step '{step.step_id}'.")
@@ -38,7 +38,7 @@ class DatabaseSaveAction(BaseActionExecutor):
             if not isinstance(data_to_save, dict):
                 raise ValueError("The resolved 'data_template' must be a dictionary (JSON object).")
 
-            rows_affected = self.db_manager.upsert_data(table_name, data_to_save, pk_columns)
+            rows_affected = await self.db_manager.upsert_data(table_name, data_to_save, pk_columns)
 
             output_data = {
                 "message": f"Successfully saved data to table '{table_name}'.",
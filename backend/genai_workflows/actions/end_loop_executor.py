@@ -19,12 +19,12 @@ class EndLoopAction(BaseActionExecutor):
         output of the previous step. It then returns the 'loop_iteration_complete'
         status.
         """
-        logger.info(f"Reached end of loop iteration at step '{step.step_id}'.")
+        logger.info("Reached end of loop iteration at step '%s'.", step.step_id)
         if step.value_to_return:
             try:
                 # Use the template filler to get the specific value from the state
                 iteration_output = self._fill_prompt_template(step.value_to_return, state)
-                logger.info(f"EndLoop returning configured value from '{step.value_to_return}'.")
+                logger.info("EndLoop returning configured value from '%s'.", step.value_to_return)
             except Exception as e:
                 logger.error(f"Could not resolve 'value_to_return' template '{step.value_to_return}': {e}", exc_info=True)
                 iteration_output = {"error": f"Failed to resolve return value: {e}"}
@@ -4,7 +4,7 @@ from .base_executor import BaseActionExecutor
 from ..workflow import WorkflowStep
 
 class FileIngestionAction(BaseActionExecutor):
-    async def execute(self, step: WorkflowStep, state: Dict[str, Any]) -> Dict[str, Any]:
+    def execute(self, step: WorkflowStep, state: Dict[str, Any]) -> Dict[str, Any]:
         """Generates a prompt for file upload and returns a pause signal."""
         prompt_for_user = self._fill_prompt_template(step.prompt_template, state)
         return {
@@ -1,16 +1,40 @@
+import asyncio
+import copy
 import httpx
 import json
 import logging
-from typing import Dict, Any
+import random
+import time
+from typing import Dict, Any, Tuple
+from urllib.parse import urlsplit
 
 from .base_executor import BaseActionExecutor
 from ..workflow import WorkflowStep
 
 logger = logging.getLogger(__name__)
 
+# Methods that are safe to re-send after the server may already have processed them.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_BASE_DELAY = 0.5  # Seconds, doubled on every attempt
+RETRY_MAX_DELAY = 8.0
+CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive failures before a host is short-circuited
+CIRCUIT_RESET_SECONDS = 30.0
+
+
+class CircuitOpenError(Exception):
+    """Raised when a host has failed repeatedly and requests to it are being short-circuited."""
+    pass
+
+
 class HttpRequestAction(BaseActionExecutor):
     """Executes a direct, deterministic HTTP request to an external API."""
 
+    # Identical GET requests that are already in flight (e.g. from concurrent executions)
+    # share a single network call instead of each doing their own round-trip.
+    _inflight: Dict[Tuple[str, str, str, bool], "asyncio.Future"] = {}
+    # Per-host circuit breaker state: host -> (consecutive failures, monotonic time the circuit reopens).
+    _circuits: Dict[str, Tuple[int, float]] = {}
+
     async def execute(self, step: WorkflowStep, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Performs the HTTP request and handles success and failure cases.
@@ -35,50 +59,133 @@ class HttpRequestAction(BaseActionExecutor):
 
         except json.JSONDecodeError as e:
             error_msg = f"Invalid JSON structure in Headers or Body template: {e}"
-            logger.error(f"Step '{step.step_id}': {error_msg}")
+            logger.error("Step '%s': %s", step.step_id, error_msg)
             return {"step_id": step.step_id, "success": False, "error": error_msg}
         except Exception as e:
             error_msg = f"Failed to prepare templates for HTTP request: {e}"
-            logger.error(f"Step '{step.step_id}': {error_msg}", exc_info=True)
+            logger.error("Step '%s': %s", step.step_id, error_msg, exc_info=True)
             return {"step_id": step.step_id, "success": False, "error": error_msg}
 
-        logger.info(f"Executing HTTP {step.http_method.upper()} request to {url}")
+        method = step.http_method.upper()
+        logger.info("Executing HTTP %s request to %s", method, url)
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.request(
-                    method=step.http_method.upper(),
-                    url=url,
-                    headers=headers,
-                    json=body,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-
-                try:
-                    response_body = response.json()
-                except json.JSONDecodeError:
-                    response_body = response.text
-
-                output = {
-                    "status_code": response.status_code,
-                    "headers": dict(response.headers),
-                    "body": response_body
-                }
-                return {"step_id": step.step_id, "success": True, "type": "http_request", "output": output}
+            output = await self._send_request(method, url, headers, body, step.include_response_headers, step.max_retries)
+            return {"step_id": step.step_id, "success": True, "type": "http_request", "output": output}
 
+        except CircuitOpenError as e:
+            error_msg = str(e)
+            logger.error("Step '%s': %s", step.step_id, error_msg)
+            return {"step_id": step.step_id, "success": False, "error": error_msg}
         except httpx.HTTPStatusError as e:
             response_text = ""
             try: response_text = e.response.text
             except Exception: response_text = "(Could not retrieve error response body)"
             error_msg = f"API returned an error: {e.response.status_code} {e.response.reason_phrase}. Response: {response_text}"
-            logger.error(f"Step '{step.step_id}': {error_msg}")
+            logger.error("Step '%s': %s", step.step_id, error_msg)
             return {"step_id": step.step_id, "success": False, "error": error_msg}
         except httpx.RequestError as e:
             error_msg = f"Network request failed: {e.__class__.__name__} - {e}"
-            logger.error(f"Step '{step.step_id}': {error_msg}")
+            logger.error("Step '%s': %s", step.step_id, error_msg)
             return {"step_id": step.step_id, "success": False, "error": error_msg}
         except Exception as e:
             error_msg = f"An unexpected error occurred during the HTTP request: {e}"
-            logger.error(f"Step '{step.step_id}': {error_msg}", exc_info=True)
-            return {"step_id": step.step_id, "success": False, "error": error_msg}
\ No newline at end of file
+            logger.error("Step '%s': %s", step.step_id, error_msg, exc_info=True)
+            return {"step_id": step.step_id, "success": False, "error": error_msg}
+
+    async def _send_request(self, method: str, url: str, headers: Dict[str, str], body: Any, include_headers: bool, max_retries: int) -> Dict[str, Any]:
+        """
+        Sends the request, coalescing idempotent GETs with an identical request already in flight.
+        Raises the underlying httpx exceptions so the caller can report them.
+        """
+        if method != "GET":
+            return await self._perform_request(method, url, headers, body, include_headers, max_retries)
+
+        key = (url, json.dumps(headers, sort_keys=True), json.dumps(body, sort_keys=True, default=str), include_headers)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._perform_request(method, url, headers, body, include_headers, max_retries))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._inflight.pop(key, None) if self._inflight.get(key) is t else None)
+        else:
+            logger.info("Joining in-flight GET request to %s", url)
+
+        # Shield the shared request so one cancelled waiter does not cancel it for the others.
+        output = await asyncio.shield(task)
+        # Deep copy so a waiter that mutates the parsed body does not change it for the others.
+        return copy.deepcopy(output)
+
+    async def _perform_request(self, method: str, url: str, headers: Dict[str, str], body: Any, include_headers: bool, max_retries: int) -> Dict[str, Any]:
+        """
+        Sends the request with jittered exponential backoff on transient failures (timeouts,
+        connection problems and 5xx responses), guarded by a per-host circuit breaker so a
+        known-down endpoint fails fast instead of waiting out the full timeout.
+        """
+        host = urlsplit(url).netloc
+        self._check_circuit(host)
+
+        attempts = max(0, max_retries or 0) + 1
+        for attempt in range(attempts):
+            try:
+                output = await self._request_once(method, url, headers, body, include_headers)
+                self._circuits.pop(host, None)
+                return output
+            except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                if isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500:
+                    # The host is up; it just rejected this particular request.
+                    self._circuits.pop(host, None)
+                    raise
+                if attempt == attempts - 1 or not self._is_transient(e, method):
+                    # The breaker counts failed requests, not attempts, so retries alone never trip it.
+                    self._record_failure(host)
+                    raise
+                delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+                logger.warning("HTTP %s %s failed (%s); retrying in %.2fs (attempt %s/%s).", method, url, e.__class__.__name__, delay, attempt + 2, attempts)
+                await asyncio.sleep(delay)
+                # Concurrent requests to the same host may have opened the circuit in the meantime.
+                self._check_circuit(host)
+
+    def _check_circuit(self, host: str):
+        """Raises CircuitOpenError while the host's circuit is open."""
+        failures, reopens_at = self._circuits.get(host, (0, 0.0))
+        if failures >= CIRCUIT_FAILURE_THRESHOLD and time.monotonic() < reopens_at:
+            raise CircuitOpenError(f"Requests to '{host}' are temporarily suspended after {failures} consecutive failures.")
+
+    def _record_failure(self, host: str):
+        # Read the current count rather than one taken before the request, so concurrent
+        # requests to the same host each add their failure instead of overwriting each other's.
+        failures, _ = self._circuits.get(host, (0, 0.0))
+        self._circuits[host] = (failures + 1, time.monotonic() + CIRCUIT_RESET_SECONDS)
+
+    @staticmethod
+    def _is_transient(error: Exception, method: str) -> bool:
+        """Decides whether a failed attempt (5xx or transport error) is worth retrying for the given method."""
+        if isinstance(error, httpx.HTTPStatusError):
+            return method in IDEMPOTENT_METHODS
+        if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+            # The request never reached the server, so even non-idempotent methods are safe to resend.
+            return True
+        return method in IDEMPOTENT_METHODS
+
+    @staticmethod
+    async def _request_once(method: str, url: str, headers: Dict[str, str], body: Any, include_headers: bool) -> Dict[str, Any]:
+        async with httpx.AsyncClient() as client:
+            response = await client.request(
+                method=method,
+                url=url,
+                headers=headers,
+                json=body,
+                timeout=30.0
+            )
+            response.raise_for_status()
+
+            try:
+                response_body = response.json()
+            except json.JSONDecodeError:
+                response_body = response.text
+
+            output = {"status_code": response.status_code, "body": response_body}
+            # Most workflows never read the response headers, so only pay for the copy when asked to.
+            if include_headers:
+                output["headers"] = dict(response.headers)
+            return output
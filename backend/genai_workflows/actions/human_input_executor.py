@@ -3,7 +3,7 @@ from .base_executor import BaseActionExecutor
 from ..workflow import WorkflowStep
 
 class HumanInputAction(BaseActionExecutor):
-    async def execute(self, step: WorkflowStep, state: Dict[str, Any]) -> Dict[str, Any]:
+    def execute(self, step: WorkflowStep, state: Dict[str, Any]) -> Dict[str, Any]:
         """Generates a prompt for the user and returns a pause signal for text input."""
         prompt_for_user = self._fill_prompt_template(step.prompt_template, state)
         return {
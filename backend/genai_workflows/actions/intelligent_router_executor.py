@@ -48,13 +48,15 @@ Respond with ONLY the name of your chosen option from the list.
         try:
             # Use the model specified in the step, or fall back to a default
             model = step.model_name or settings.DEFAULT_MODEL
-            response = await self.client.chat.completions.create(
+            content = await self.engine.llm_cache.complete(
+                self.client,
                 model=model,
                 messages=messages,
                 temperature=0.0,
+                max_tokens=50, # The answer is a single route name
             )
 
-            chosen_route_name = response.choices[0].message.content.strip().replace('"', '').replace("'", "")
+            chosen_route_name = content.strip().replace('"', '').replace("'", "")
             logger.info(f"Intelligent Router chose route: '{chosen_route_name}'")
 
             if chosen_route_name in step.routes:
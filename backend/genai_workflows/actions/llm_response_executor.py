@@ -2,7 +2,7 @@ import json
 import logging
 from typing import Dict, Any
 
-from .base_executor import BaseActionExecutor
+from .base_executor import BaseActionExecutor, stream_callback
 from ..workflow import WorkflowStep
 from ...config import settings
 
@@ -18,8 +18,20 @@ class LlmResponseAction(BaseActionExecutor):
             # 2. Make the API call with the optimized prompt.
             messages = [{"role": "user", "content": final_prompt}]
             model = step.model_name or settings.DEFAULT_MODEL
-            response = await self.client.chat.completions.create(model=model, messages=messages, temperature=0.5)
-            llm_output = response.choices[0].message.content
+            on_token = stream_callback.get()
+            if on_token is None:
+                response = await self.client.chat.completions.create(model=model, messages=messages, temperature=0.5)
+                llm_output = response.choices[0].message.content
+            else:
+                # Forward each delta as it arrives so the caller can show it before generation ends.
+                parts = []
+                stream = await self.client.chat.completions.create(model=model, messages=messages, temperature=0.5, stream=True)
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        on_token(delta)
+                        parts.append(delta)
+                llm_output = "".join(parts)
 
             return {"step_id": step.step_id, "success": True, "type": "llm_response", "output": llm_output}
         except Exception as e:
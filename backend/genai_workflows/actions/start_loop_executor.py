@@ -35,16 +35,43 @@ class StartLoopAction(BaseActionExecutor):
                 return {"step_id": step.step_id, "success": False, "error": error_msg}
 
             # Create and save the initial state for this loop.
+            # Results are preallocated and filled by iteration index rather than appended.
             state["collected_inputs"][loop_state_key] = {
                 "collection": input_collection,
                 "index": 0,
-                "results": [],
+                "results": [None] * len(input_collection),
             }
             logger.info(f"Initialized loop '{step.step_id}' with {len(input_collection)} items.")
 
         # Retrieve the current state of the loop.
         loop_state = state["collected_inputs"][loop_state_key]
         current_index = loop_state["index"]
+
+        # If we are resuming from a completed iteration, store its result in that iteration's slot.
+        # This must happen before the completion check so the final iteration is not dropped.
+        if current_index > 0:
+            last_history_entry = state["step_history"][-1] if state.get("step_history") else {}
+            if last_history_entry.get("type") == "end_loop":
+                loop_state["results"][current_index - 1] = last_history_entry.get("output")
+                logger.info("Loop '%s': Aggregated result from iteration %d.", step.step_id, current_index - 1)
+
+        return self._next_iteration(step, state, loop_state)
+
+    def advance(self, step: WorkflowStep, state: Dict[str, Any], iteration_output: Any) -> Dict[str, Any]:
+        """
+        Records the output of the iteration that just finished and starts the next one, or
+        completes the loop. The executor calls this directly when an end_loop is reached, so
+        returning to the loop does not go through a full step dispatch.
+        """
+        loop_state = state["collected_inputs"][f"__loop_state_{step.step_id}"]
+        loop_state["results"][loop_state["index"] - 1] = iteration_output
+        logger.info("Loop '%s': Aggregated result from iteration %d.", step.step_id, loop_state["index"] - 1)
+        return self._next_iteration(step, state, loop_state)
+
+    def _next_iteration(self, step: WorkflowStep, state: Dict[str, Any], loop_state: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns the loop's completion result, or sets up the next item and returns the iteration signal."""
+        loop_state_key = f"__loop_state_{step.step_id}"
+        current_index = loop_state["index"]
         collection = loop_state["collection"]
 
         # --- Phase 2: Check for Loop Completion ---
@@ -65,20 +92,15 @@ class StartLoopAction(BaseActionExecutor):
 
         # --- Phase 3: Process the Next Iteration ---
 
-        # If we are resuming from a completed iteration, aggregate its result.
-        last_history_entry = state["step_history"][-1] if state.get("step_history") else {}
-        if last_history_entry.get("type") == "end_loop":
-            loop_state["results"].append(last_history_entry.get("output"))
-            logger.info(f"Loop '{step.step_id}': Aggregated result from iteration {current_index -1}.")
-
         # Prepare the state for the current iteration.
         current_item = collection[current_index]
         state["collected_inputs"][step.current_item_output_key] = current_item
-        logger.info(f"Loop '{step.step_id}': Starting iteration {current_index}. Current item key '{step.current_item_output_key}' is set.")
+        logger.info("Loop '%s': Starting iteration %d. Current item key '%s' is set.", step.step_id, current_index, step.current_item_output_key)
 
         # Crucially, advance the index *before* starting the sub-graph.
+        # loop_state is a live reference to the dict stored in collected_inputs, so no write-back is needed.
+        # It stays a plain dict (not a dataclass) because paused execution state is stored as JSON.
         loop_state["index"] += 1
-        state["collected_inputs"][loop_state_key] = loop_state
 
         # Return a special status to the main executor.
         # This tells the executor to start a sub-graph execution at the 'loop_body_start_step_id'
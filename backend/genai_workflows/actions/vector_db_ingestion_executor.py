@@ -1,25 +1,54 @@
+import asyncio
 import json
 import logging
+import os
+import tempfile
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 from .base_executor import BaseActionExecutor
+from ..document_store import write_documents
+from ..text_splitter import fast_split
 from ..workflow import WorkflowStep
 
 try:
     import faiss
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
     RAG_AVAILABLE = True
 except ImportError:
     RAG_AVAILABLE = False
 
+try:
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    LANGCHAIN_SPLITTER_AVAILABLE = True
+except ImportError:
+    LANGCHAIN_SPLITTER_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+EMBEDDING_BATCH_SIZE = 128  # Chunks per embeddings API request
+EMBEDDING_CONCURRENCY = 8  # Embedding requests allowed in flight at once
+
+# Collections at least this large get an HNSW graph index (O(log N) search) instead of
+# an exact flat scan. Smaller collections keep exact search, which is already fast there.
+HNSW_MIN_VECTORS = 10_000
+HNSW_M = 32  # Graph neighbours per node
+HNSW_EF_CONSTRUCTION = 200
+
+# Index types an ingestion node can request. "auto" picks flat or HNSW by collection size;
+# "sq8" (8-bit scalar-quantized HNSW) and "pq" (product quantization) store compressed vectors
+# and must be trained on a sample before vectors are added.
+INDEX_TYPES = frozenset({"auto", "flat", "hnsw", "sq8", "pq"})
+PQ_M = 64  # Sub-quantizers per vector (reduced to a divisor of the dimension if needed)
+PQ_NBITS = 8  # Bits per sub-quantizer code
+PQ_MIN_VECTORS = 39 * 2 ** PQ_NBITS  # FAISS's minimum for well-trained PQ codebooks; smaller collections use flat
+QUANTIZER_TRAIN_SAMPLE = 50_000  # Vectors sampled for training quantized indexes
+QUANTIZER_ADD_SLAB = 8_192  # Vectors added per call when filling a trained index from the memmap
+
 class VectorDbIngestionAction(BaseActionExecutor):
     async def execute(self, step: WorkflowStep, state: Dict[str, Any]) -> Dict[str, Any]:
         """Splits text, gets embeddings, and saves to a FAISS vector store."""
         if not RAG_AVAILABLE:
-            return {"step_id": step.step_id, "success": False, "error": "RAG dependencies (faiss, langchain) are not installed."}
+            return {"step_id": step.step_id, "success": False, "error": "RAG dependency (faiss) is not installed."}
 
         try:
             # Step 1: Use the main helper to fill the entire template.
@@ -32,65 +61,74 @@ class VectorDbIngestionAction(BaseActionExecutor):
             if not input_data:
                 return {"step_id": step.step_id, "success": False, "error": "Ingestion step received no data after filling the template. Check if the source variables exist and have content."}
 
-            # The result of _fill_prompt_template for complex types (like a list from File Ingestion)
-            # is a JSON string, so we should try to parse it.
-            try:
-                potential_list = json.loads(input_data)
-                if isinstance(potential_list, list):
-                    input_data = potential_list
-            except (json.JSONDecodeError, TypeError):
-                # This is expected if the template resulted in a plain string. We can safely ignore it.
-                pass
+            # A template that is a single placeholder (e.g. "{input.files}") already resolves to the
+            # raw Python object, so a list from File Ingestion arrives here as-is. Only lists embedded
+            # in a larger template were stringified to JSON and need parsing back.
+            # Plain prose can't be a JSON list, so only attempt the parse when it could be one;
+            # a failing parse on a multi-MB text would otherwise scan a prefix before raising.
+            if isinstance(input_data, str) and input_data.lstrip()[:1] == "[":
+                try:
+                    potential_list = json.loads(input_data)
+                    if isinstance(potential_list, list):
+                        input_data = potential_list
+                except json.JSONDecodeError:
+                    # This is expected if the template resulted in a plain string. We can safely ignore it.
+                    pass
 
             # === Step 2: Initialize the text splitter ===
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=step.chunk_size,
-                chunk_overlap=step.chunk_overlap
-            )
+            if step.splitter == "fast":
+                # One forward pass with greedy chunk filling; avoids LangChain's recursive separator search.
+                def split(text: str) -> List[str]:
+                    return fast_split(text, step.chunk_size, step.chunk_overlap)
+            elif LANGCHAIN_SPLITTER_AVAILABLE:
+                text_splitter = RecursiveCharacterTextSplitter(
+                    chunk_size=step.chunk_size,
+                    chunk_overlap=step.chunk_overlap
+                )
+                split = text_splitter.split_text
+            else:
+                return {"step_id": step.step_id, "success": False, "error": "LangChain is not installed. Install it or set the ingestion node's splitter to 'fast'."}
 
             # === Step 3: Process input based on its type ===
-            documents = []
+            # Both splitters return plain strings, so the chunks are used as-is from here on.
+            doc_contents: List[str] = []
             if isinstance(input_data, list):
                 # Handles cases where the input variable was a list of strings (e.g., from file ingestion).
                 logger.info(f"Processing {len(input_data)} document(s) from input list.")
-                # We need to ensure all items in the list are strings.
-                string_docs = [str(doc) for doc in input_data]
-                langchain_docs = text_splitter.create_documents(string_docs)
-                documents = text_splitter.split_documents(langchain_docs)
+                for doc in input_data:
+                    # Only non-string items (e.g. numbers or dicts) need converting.
+                    doc_contents.extend(split(doc if isinstance(doc, str) else str(doc)))
             elif isinstance(input_data, str):
                 # Handles cases where the template resulted in a single block of text.
                 logger.info("Processing a single text block input.")
-                split_texts = text_splitter.split_text(input_data)
-                documents = [d for d in split_texts]
+                doc_contents = split(input_data)
             else:
                 return {"step_id": step.step_id, "success": False, "error": f"Unsupported input type for ingestion: {type(input_data)}"}
 
-            if not documents:
+            if not doc_contents:
                 return {"step_id": step.step_id, "success": False, "error": "Text splitting resulted in zero documents. Check input content and chunk settings."}
 
-            logger.info(f"Splitting successful. Total chunks created: {len(documents)}")
-
-            doc_contents = [doc.page_content if hasattr(doc, 'page_content') else doc for doc in documents]
-
-            # === Step 4: Embed and Ingest ===
-            embedding_model = step.embedding_model or "text-embedding-3-small"
-            response = await self.client.embeddings.create(input=doc_contents, model=embedding_model)
-            embeddings = [item.embedding for item in response.data]
-
-            dimension = len(embeddings[0])
-            index = faiss.IndexFlatL2(dimension)
-            index.add(np.array(embeddings, dtype=np.float32))
+            logger.info(f"Splitting successful. Total chunks created: {len(doc_contents)}")
 
             # Also allow the collection name to be sourced from any state variable.
             collection_name = self._fill_prompt_template(step.collection_name, state)
             if not collection_name:
                 return {"step_id": step.step_id, "success": False, "error": "Missing 'collection_name' for ingestion step."}
 
+            index_type = step.index_type or "auto"
+            if index_type not in INDEX_TYPES:
+                return {"step_id": step.step_id, "success": False, "error": f"Unsupported index_type '{index_type}'. Expected one of: {', '.join(sorted(INDEX_TYPES))}."}
+
+            # === Step 4: Embed and Ingest ===
             vector_store_dir = "vector_stores"
-            faiss.write_index(index, f"{vector_store_dir}/{collection_name}.faiss")
+            embedding_model = step.embedding_model or "text-embedding-3-small"
+            index = await self._embed_into_index(doc_contents, embedding_model, vector_store_dir, index_type)
 
-            with open(f"{vector_store_dir}/{collection_name}.json", 'w') as f:
-                json.dump(doc_contents, f)
+            # Both files can be hundreds of MB; write them concurrently and off the event loop.
+            await asyncio.gather(
+                asyncio.to_thread(faiss.write_index, index, f"{vector_store_dir}/{collection_name}.faiss"),
+                asyncio.to_thread(write_documents, f"{vector_store_dir}/{collection_name}.docs", f"{vector_store_dir}/{collection_name}.idx", doc_contents),
+            )
 
             output_message = f"Successfully ingested {len(doc_contents)} chunks into collection '{collection_name}'."
             logger.info(output_message)
@@ -99,4 +137,143 @@ class VectorDbIngestionAction(BaseActionExecutor):
         except Exception as e:
             error_msg = f"Vector DB ingestion failed: {e}"
             logger.error(error_msg, exc_info=True)
-            return {"step_id": step.step_id, "success": False, "error": error_msg}
\ No newline at end of file
+            return {"step_id": step.step_id, "success": False, "error": error_msg}
+
+    @staticmethod
+    def _build_index(index_type: str, dimension: int, vector_count: int) -> "faiss.Index":
+        """
+        Builds the requested index type. "auto" chooses an exact flat index for small collections
+        and an HNSW graph for large ones. All types use inner-product similarity over normalized
+        vectors, so query-side handling is the same for each.
+        """
+        if index_type == "pq" and vector_count < PQ_MIN_VECTORS:
+            logger.warning(f"Only {vector_count} vectors; too few to train a PQ index. Using a flat index instead.")
+            index_type = "flat"
+        if index_type == "auto":
+            index_type = "flat" if vector_count < HNSW_MIN_VECTORS else "hnsw"
+
+        logger.info(f"Building '{index_type}' index for {vector_count} vectors.")
+        if index_type == "flat":
+            return faiss.IndexFlatIP(dimension)
+        if index_type == "pq":
+            # Each sub-quantizer encodes an equal slice of the vector, so M must divide the dimension.
+            m = next(m for m in range(min(PQ_M, dimension), 0, -1) if dimension % m == 0)
+            return faiss.IndexPQ(dimension, m, PQ_NBITS, faiss.METRIC_INNER_PRODUCT)
+        if index_type == "sq8":
+            index = faiss.IndexHNSWSQ(dimension, faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexHNSWFlat(dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        return index
+
+    async def _embed_into_index(self, doc_contents: List[str], embedding_model: str, staging_dir: str, index_type: str = "auto") -> "faiss.Index":
+        """
+        Embeds each distinct chunk once and builds the FAISS index as a two-stage pipeline: up to
+        EMBEDDING_CONCURRENCY workers embed fixed-size batches while an indexer adds finished
+        batches to the index (in document order, off the event loop), so index construction
+        overlaps with the remaining embedding round-trips.
+
+        Each batch is written into a memory-mapped (N, D) float32 matrix in a temporary ".vecs" file
+        under `staging_dir`, unique to this call so concurrent ingestions never map the same file, and
+        added from there with its chunk positions as ids. Quantized indexes must be trained before
+        anything is added, so for those the memmap is where the full-precision vectors wait (on
+        disk, not in memory) until the index is trained on a sample and filled from it once
+        embedding finishes. The file is scratch space only and is deleted once the index is built,
+        or if building it fails.
+        """
+        # Identical chunks (repeated headers, footers, boilerplate) are embedded only once.
+        # unique_ids[i] is the position of chunk i's text in unique_chunks, and first_positions[u]
+        # the first chunk with that text. Both are assigned in document order.
+        ids_by_text: Dict[str, int] = {}
+        unique_chunks: List[str] = []
+        first_positions: List[int] = []
+        unique_ids = np.empty(len(doc_contents), dtype=np.int64)
+        for position, chunk in enumerate(doc_contents):
+            unique_id = ids_by_text.setdefault(chunk, len(unique_chunks))
+            if unique_id == len(unique_chunks):
+                unique_chunks.append(chunk)
+                first_positions.append(position)
+            unique_ids[position] = unique_id
+        first_positions = np.array(first_positions, dtype=np.int64)
+
+        chunk_queue: asyncio.Queue = asyncio.Queue()
+        for offset in range(0, len(unique_chunks), EMBEDDING_BATCH_SIZE):
+            chunk_queue.put_nowait((offset, unique_chunks[offset:offset + EMBEDDING_BATCH_SIZE]))
+        batch_count = chunk_queue.qsize()
+        embedded_queue: asyncio.Queue = asyncio.Queue(maxsize=EMBEDDING_CONCURRENCY * 2)
+        logger.info(f"Embedding {len(unique_chunks)} unique of {len(doc_contents)} chunks in {batch_count} batch(es).")
+
+        async def embedder():
+            while not chunk_queue.empty():
+                offset, batch = chunk_queue.get_nowait()
+                response = await self.client.embeddings.create(input=batch, model=embedding_model)
+                vectors = np.array([item.embedding for item in response.data], dtype=np.float32)
+                await embedded_queue.put((offset, vectors))
+
+        async def indexer() -> "faiss.Index":
+            index = None
+            matrix = None
+            try:
+                pending: Dict[int, np.ndarray] = {}
+                next_offset = 0  # Unique chunks embedded so far
+                next_position = 0  # Document positions written to the matrix so far
+                for _ in range(batch_count):
+                    offset, vectors = await embedded_queue.get()
+                    pending[offset] = vectors
+                    # Batches can finish out of order; only add once every earlier batch is in.
+                    while next_offset in pending:
+                        vectors = pending.pop(next_offset)
+                        # Unit-length vectors make inner product equal to cosine similarity, which lets
+                        # FAISS rank with a single BLAS matrix product instead of pairwise L2 distances.
+                        faiss.normalize_L2(vectors)
+                        if index is None:
+                            index = faiss.IndexIDMap2(self._build_index(index_type, vectors.shape[1], len(doc_contents)))
+                            fd, vectors_path = tempfile.mkstemp(dir=staging_dir, suffix=".vecs")
+                            os.close(fd)
+                            matrix = np.memmap(vectors_path, dtype=np.float32, mode='w+', shape=(len(doc_contents), vectors.shape[1]))
+                        end = next_offset + len(vectors)
+
+                        # Every document up to the first one whose text is not embedded yet can be written.
+                        start = next_position
+                        stop = len(doc_contents) if end == len(unique_chunks) else int(first_positions[end])
+                        batch_ids = unique_ids[start:stop]
+                        is_new = batch_ids >= next_offset
+                        matrix[start:stop][is_new] = vectors[batch_ids[is_new] - next_offset]
+                        # Repeats of earlier texts copy the vector already written at their first position.
+                        matrix[start:stop][~is_new] = matrix[first_positions[batch_ids[~is_new]]]
+
+                        if index.is_trained:
+                            ids = np.arange(start, stop, dtype=np.int64)
+                            await asyncio.to_thread(index.add_with_ids, matrix[start:stop], ids)
+                        next_offset, next_position = end, stop
+                if matrix is not None and not index.is_trained:
+                    await asyncio.to_thread(self._train_and_fill, index, matrix)
+                return index
+            finally:
+                # The matrix only stages vectors for the index; nothing reads it afterwards.
+                if matrix is not None:
+                    del matrix
+                    os.remove(vectors_path)
+
+        tasks = [asyncio.create_task(indexer())]
+        tasks += [asyncio.create_task(embedder()) for _ in range(min(EMBEDDING_CONCURRENCY, batch_count))]
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            # If any stage failed, make sure the others do not linger waiting on the queues.
+            for task in tasks:
+                task.cancel()
+        return results[0]
+
+    @staticmethod
+    def _train_and_fill(index: "faiss.Index", matrix: np.ndarray) -> None:
+        """Trains a quantized index on a sample of the collected vectors, then adds all of them in slabs."""
+        vector_count = len(matrix)
+        sample_size = min(vector_count, QUANTIZER_TRAIN_SAMPLE)
+        # Sorted positions keep the sample read sequential through the memmap.
+        sample_ids = np.sort(np.random.default_rng(0).choice(vector_count, sample_size, replace=False))
+        logger.info(f"Training quantized index on {sample_size} of {vector_count} vectors.")
+        index.train(np.ascontiguousarray(matrix[sample_ids]))
+        for offset in range(0, vector_count, QUANTIZER_ADD_SLAB):
+            end = min(offset + QUANTIZER_ADD_SLAB, vector_count)
+            index.add_with_ids(matrix[offset:end], np.arange(offset, end, dtype=np.int64))
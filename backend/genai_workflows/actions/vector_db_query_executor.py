@@ -1,11 +1,16 @@
+import asyncio
 import os
 import json
 import logging
 import numpy as np
-from typing import Dict, Any
+from collections import OrderedDict
+from typing import Dict, Any, List, Sequence, Tuple
 
 from .base_executor import BaseActionExecutor
+from .vector_db_ingestion_executor import EMBEDDING_BATCH_SIZE, EMBEDDING_CONCURRENCY
+from ..document_store import DocumentStore
 from ..workflow import WorkflowStep
+from ...config import settings
 
 try:
     import faiss
@@ -13,56 +18,151 @@ try:
 except ImportError:
     RAG_AVAILABLE = False
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+if RAG_AVAILABLE:
+    # FAISS parallelizes each search over OpenMP; make the thread count explicit instead of
+    # relying on whatever the OpenMP runtime picks up from the environment.
+    faiss.omp_set_num_threads(settings.FAISS_THREADS or os.cpu_count() or 1)
+
+HNSW_EF_SEARCH = 64  # Search breadth for HNSW indexes; higher trades latency for recall
+
+# Process-wide LRU of loaded collections: faiss_path -> (mtimes, index, documents).
+# Entries are reloaded whenever either file on disk changes (e.g. after re-ingestion).
+_COLLECTION_CACHE: "OrderedDict[str, Tuple[Tuple[float, float], Any, Sequence[str]]]" = OrderedDict()
+_COLLECTION_CACHE_SIZE = 16
+
+
+def _load_collection(faiss_path: str, docs_path: str) -> Tuple[Any, Sequence[str]]:
+    """
+    Returns the (index, documents) pair for a collection, reading from disk only on a cache miss.
+    Binary ".docs" stores are memory-mapped and decode documents on access; legacy ".json"
+    collections are parsed in full.
+    """
+    mtimes = (os.path.getmtime(faiss_path), os.path.getmtime(docs_path))
+    cached = _COLLECTION_CACHE.get(faiss_path)
+    if cached and cached[0] == mtimes:
+        _COLLECTION_CACHE.move_to_end(faiss_path)
+        return cached[1], cached[2]
+
+    index = faiss.read_index(faiss_path)
+    if docs_path.endswith(".docs"):
+        documents = DocumentStore(docs_path, f"{docs_path[:-len('.docs')]}.idx")
+    elif orjson is not None:
+        # Legacy JSON collections are parsed in full, so use the faster parser when it is installed.
+        with open(docs_path, 'rb') as f:
+            documents = orjson.loads(f.read())
+    else:
+        with open(docs_path, 'r') as f:
+            documents = json.load(f)
+
+    _COLLECTION_CACHE[faiss_path] = (mtimes, index, documents)
+    _COLLECTION_CACHE.move_to_end(faiss_path)
+    while len(_COLLECTION_CACHE) > _COLLECTION_CACHE_SIZE:
+        _COLLECTION_CACHE.popitem(last=False)
+    return index, documents
+
 class VectorDbQueryAction(BaseActionExecutor):
     async def execute(self, step: WorkflowStep, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Queries a FAISS vector store to find similar documents."""
+        """
+        Queries a FAISS vector store to find similar documents. If the query template resolves
+        to a list of strings, all of them are searched in one batch (see execute_many).
+        """
         if not RAG_AVAILABLE:
             return {"step_id": step.step_id, "success": False, "error": "RAG dependencies (faiss) are not installed."}
 
         try:
-            collection_name = step.collection_name
-            if not collection_name:
+            if not step.collection_name:
                 return {"step_id": step.step_id, "success": False, "error": "Missing 'collection_name' for query step."}
 
             query_text = self._fill_prompt_template(step.prompt_template, state)
             if not query_text:
                 return {"step_id": step.step_id, "success": False, "error": "Query step received no query text."}
 
-            vector_store_dir = "vector_stores"
-            faiss_path = f"{vector_store_dir}/{collection_name}.faiss"
-            docs_path = f"{vector_store_dir}/{collection_name}.json"
-
-            if not os.path.exists(faiss_path) or not os.path.exists(docs_path):
-                logger.warning(f"Collection '{collection_name}' not found. Returning empty search results.")
-                # Instead of failing, we return a successful result with an empty list.
-                # This prevents the workflow from crashing.
-                return {
-                    "step_id": step.step_id,
-                    "success": True,
-                    "type": "vector_db_query",
-                    "output": {"query": query_text, "retrieved_docs": []}
-                }
+            if isinstance(query_text, list) and all(isinstance(q, str) for q in query_text):
+                return await self.execute_many(step, state, query_text)
 
-            index = faiss.read_index(faiss_path)
-            with open(docs_path, 'r') as f:
-                documents = json.load(f)
-
-            embedding_model = step.embedding_model or "text-embedding-3-small"
-            query_embedding = (await self.client.embeddings.create(input=[query_text], model=embedding_model)).data[0].embedding
+            retrieved_docs = (await self._search(step, [str(query_text)]))[0]
+            output = {"query": query_text, "retrieved_docs": retrieved_docs}
+            return {"step_id": step.step_id, "success": True, "type": "vector_db_query", "output": output}
 
-            top_k = step.top_k or 5
-            distances, indices = index.search(np.array([query_embedding], dtype=np.float32), top_k)
+        except Exception as e:
+            error_msg = f"Vector DB query failed: {e}"
+            logger.error(error_msg, exc_info=True)
+            return {"step_id": step.step_id, "success": False, "error": error_msg}
 
-            retrieved_docs = [documents[i] for i in indices[0]]
+    async def execute_many(self, step: WorkflowStep, state: Dict[str, Any], queries: List[str]) -> Dict[str, Any]:
+        """
+        Runs several queries against the step's collection with a single embeddings request
+        and a single FAISS search. The output is one {"query", "retrieved_docs"} entry per query,
+        in the order given.
+        """
+        if not RAG_AVAILABLE:
+            return {"step_id": step.step_id, "success": False, "error": "RAG dependencies (faiss) are not installed."}
 
-            output = {"query": query_text, "retrieved_docs": retrieved_docs}
-            logger.info(f"Retrieved {len(retrieved_docs)} documents from '{collection_name}'.")
+        try:
+            if not step.collection_name:
+                return {"step_id": step.step_id, "success": False, "error": "Missing 'collection_name' for query step."}
 
+            results = await self._search(step, queries)
+            output = [{"query": query, "retrieved_docs": docs} for query, docs in zip(queries, results)]
             return {"step_id": step.step_id, "success": True, "type": "vector_db_query", "output": output}
 
         except Exception as e:
             error_msg = f"Vector DB query failed: {e}"
             logger.error(error_msg, exc_info=True)
-            return {"step_id": step.step_id, "success": False, "error": error_msg}
\ No newline at end of file
+            return {"step_id": step.step_id, "success": False, "error": error_msg}
+
+    async def _search(self, step: WorkflowStep, queries: List[str]) -> List[List[str]]:
+        """
+        Embeds the queries in EMBEDDING_BATCH_SIZE requests (concurrently, like ingestion) and
+        searches them as a single (B, D) matrix on a worker thread.
+        """
+        collection_name = step.collection_name
+        vector_store_dir = "vector_stores"
+        faiss_path = f"{vector_store_dir}/{collection_name}.faiss"
+        docs_path = f"{vector_store_dir}/{collection_name}.docs"
+        if not os.path.exists(docs_path):
+            # Collections ingested before the binary document store keep a JSON list instead.
+            docs_path = f"{vector_store_dir}/{collection_name}.json"
+
+        if not os.path.exists(faiss_path) or not os.path.exists(docs_path):
+            logger.warning(f"Collection '{collection_name}' not found. Returning empty search results.")
+            # Instead of failing, we return empty results so the workflow does not crash.
+            return [[] for _ in queries]
+        if not queries:
+            return []
+
+        index, documents = _load_collection(faiss_path, docs_path)
+
+        embedding_model = step.embedding_model or "text-embedding-3-small"
+        semaphore = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+
+        async def embed(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                response = await self.client.embeddings.create(input=batch, model=embedding_model)
+            return [item.embedding for item in response.data]
+
+        batches = await asyncio.gather(*(embed(queries[offset:offset + EMBEDDING_BATCH_SIZE]) for offset in range(0, len(queries), EMBEDDING_BATCH_SIZE)))
+        query_vectors = np.array([vector for batch in batches for vector in batch], dtype=np.float32)
+        if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            # Inner-product collections store normalized vectors; older L2 collections do not.
+            faiss.normalize_L2(query_vectors)
+
+        top_k = step.top_k or 5
+        # Collections built with chunk ids wrap the actual index in an IndexIDMap2.
+        base_index = faiss.downcast_index(index.index) if hasattr(index, "id_map") else index
+        # Passed per search rather than set on the shared cached index, since searches run concurrently.
+        params = faiss.SearchParametersHNSW(efSearch=max(HNSW_EF_SEARCH, top_k)) if hasattr(base_index, "hnsw") else None
+        # A large batched search can take a while, so it runs off the event loop (FAISS releases the GIL).
+        distances, indices = await asyncio.to_thread(index.search, query_vectors, top_k, params=params)
+
+        # Ids are chunk positions in the documents list. FAISS pads with -1 when fewer than top_k neighbours are found.
+        results = [[documents[i] for i in row if i >= 0] for row in indices]
+        logger.info(f"Retrieved documents for {len(queries)} quer{'y' if len(queries) == 1 else 'ies'} from '{collection_name}'.")
+        return results
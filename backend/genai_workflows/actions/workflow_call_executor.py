@@ -22,9 +22,11 @@ class WorkflowCallAction(BaseActionExecutor):
         sub_context = {}
         if step.input_mappings:
             try:
-                # This helper now returns a ready-to-use Python dictionary.
+                # This helper now returns a ready-to-use Python dictionary. Values mapped from a single
+                # placeholder are the parent's own objects, passed by reference rather than copied.
                 sub_context = self._fill_json_template(step.input_mappings, state)
-                logger.info(f"Passing mapped context to sub-workflow: {sub_context}")
+                # Log only the keys; formatting the values would stringify every mapped document.
+                logger.info("Passing mapped context to sub-workflow with keys: %s", list(sub_context))
             except json.JSONDecodeError as e:
                 # This error means the user's template itself is malformed JSON.
                 error_msg = f"Invalid JSON structure in 'input_mappings' for step '{step.step_id}': {e}"
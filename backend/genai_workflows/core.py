@@ -1,6 +1,8 @@
+import asyncio
 import os
-import shutil
+import importlib.util
 
+import httpx
 import openai
 import logging
 import uuid
@@ -8,7 +10,9 @@ from typing import Dict, List, Optional, Any
 
 from fastapi import UploadFile
 
+from .database_manager import DatabaseManager
 from .file_processor import FileProcessor
+from .llm_cache import LLMCache, ToolCallCache
 from .workflow import Workflow
 from .storage import WorkflowStorage
 from ..tools.registry import ToolRegistry
@@ -16,6 +20,10 @@ from .router import WorkflowRouter
 from .executor import WorkflowExecutor
 from .visualization import WorkflowVisualizer
 from .interactive_parser import InteractiveWorkflowParser
+from ..config import settings
+
+# HTTP/2 multiplexing is only available when the optional 'h2' package is installed.
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
 
 
 class WorkflowEngine:
@@ -24,10 +32,27 @@ class WorkflowEngine:
     Orchestrates creation, execution, visualization, and state management.
     """
 
-    def __init__(self, openai_api_key: str, db_path: str = "workflows.db", default_model: str = "gpt-4o-mini"):
+    def __init__(self, openai_api_key: str, db_path: str = "workflows.db", default_model: str = "gpt-4o-mini", llm_cache: Optional[LLMCache] = None):
         """Initializes all components of the workflow system."""
-        self.client = openai.AsyncOpenAI(api_key=openai_api_key)
+        # A single client (and therefore a single keep-alive connection pool) is shared by the
+        # router, the executor and every action, so LLM and embedding calls reuse connections.
+        self.client = openai.AsyncOpenAI(
+            api_key=openai_api_key,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+            http_client=openai.DefaultAsyncHttpxClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            ),
+        )
         self.storage = WorkflowStorage(db_path)
+        # Shared by the actions that make deterministic LLM calls (condition checks, routing).
+        self.llm_cache = llm_cache or LLMCache()
+        # Past tool choices of agentic steps, reused for near-identical prompts when enabled.
+        self.tool_call_cache = ToolCallCache()
 
         # Define the directories where your tools are located.
         # The system will automatically scan these for functions with @tool.
@@ -50,11 +75,23 @@ class WorkflowEngine:
         self.default_model = default_model
 
         self.logger = logging.getLogger(__name__)
+        if not HTTP2_AVAILABLE:
+            self.logger.info("Package 'h2' not installed; the OpenAI client will use HTTP/1.1 keep-alive connections.")
 
         # Ensure other required directories exist
         os.makedirs("vector_stores", exist_ok=True)
         os.makedirs("file_attachments", exist_ok=True)
 
+    async def close(self):
+        """
+        Releases the pooled connections held by the shared OpenAI client, the file extraction
+        workers, the workflow storage connections and the application database connections.
+        """
+        await self.client.close()
+        self.file_processor.close()
+        self.storage.close()
+        DatabaseManager(settings.DATA_DB_PATH).close()
+
     def rescan_and_load_tools(self) -> Dict[str, Any]:
         """
         Triggers a dynamic rescan of the tool directories to find new or
@@ -72,7 +109,7 @@ class WorkflowEngine:
         Handles file uploads by delegating to the FileProcessor based on the
         paused step's action type.
         """
-        self.logger.info(f"Resuming execution {execution_id} with {len(files)} file(s).")
+        self.logger.info("Resuming execution %s with %d file(s).", execution_id, len(files))
 
         paused_state = self.storage.get_execution_state(execution_id)
         if not paused_state:
@@ -113,25 +150,27 @@ class WorkflowEngine:
         Starts a new interactive session to build a workflow conversationally.
         Returns the parser instance which manages the conversation.
         """
-        self.logger.info(f"Starting interactive session for new workflow: '{name}'")
+        self.logger.info("Starting interactive session for new workflow: '%s'", name)
         self.interactive_parser.start_new_workflow(name, description, owner)
         return self.interactive_parser
 
     def save_workflow(self, workflow: Workflow) -> int:
         """Saves a completed workflow object to the database."""
         workflow_id = self.storage.save_workflow(workflow)
-        self.logger.info(f"Successfully saved workflow '{workflow.name}' with ID {workflow_id}")
+        self.logger.info("Successfully saved workflow '%s' with ID %s", workflow.name, workflow_id)
         return workflow_id
 
     async def start_execution(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Finds the best workflow for a query via the router and starts a new execution.
         """
-        all_workflows = self.storage.get_all_workflows()
-        matching_workflow = self.router.find_matching_workflow(query, all_workflows)
+        # Routing only needs names, descriptions and triggers; the full workflow is loaded once chosen.
+        summaries = self.storage.list_workflow_summaries()
+        match = await self.router.find_matching_workflow(query, summaries)
+        matching_workflow = self.storage.get_workflow(match.id) if match else None
 
         if not matching_workflow:
-            self.logger.warning(f"No matching workflow found for query: '{query}'.")
+            self.logger.warning("No matching workflow found for query: '%s'.", query)
             return { "status": "failed", "error": "No matching workflow found." }
 
         return await self._init_and_run(matching_workflow, query, context)
@@ -142,7 +181,7 @@ class WorkflowEngine:
         """
         workflow = self.storage.get_workflow(workflow_id)
         if not workflow:
-            self.logger.error(f"Execution start failed: Workflow with ID {workflow_id} not found.")
+            self.logger.error("Execution start failed: Workflow with ID %s not found.", workflow_id)
             return { "status": "failed", "error": f"Workflow with ID {workflow_id} not found."}
 
         return await self._init_and_run(workflow, query, context)
@@ -164,7 +203,7 @@ class WorkflowEngine:
             "final_response": None
         }
 
-        self.logger.info(f"Starting new execution {execution_id} for workflow '{workflow.name}' (ID: {workflow.id})")
+        self.logger.info("Starting new execution %s for workflow '%s' (ID: %s)", execution_id, workflow.name, workflow.id)
         return await self._run_execution_loop(workflow, initial_state)
 
     async def resume_execution(self, execution_id: str, user_input: Any) -> Dict[str, Any]:
@@ -177,6 +216,9 @@ class WorkflowEngine:
         if not workflow:
             return {"status": "failed", "error": f"Associated workflow ID {paused_state['workflow_id']} could not be found."}
 
+        # Stored history rows may predate their compaction, so compact the loaded history again.
+        paused_state.pop("step_history_compacted", None)
+
         paused_step_id = paused_state.get("current_step_id")
         paused_step = workflow.get_step(paused_step_id)
         if not paused_step:
@@ -189,23 +231,24 @@ class WorkflowEngine:
         if output_key:
             paused_state["collected_inputs"][output_key] = user_input
 
-            input_summary = str(user_input)
-            if isinstance(user_input, list) and len(user_input) > 0:
-                input_summary = f"[{len(user_input)} document(s)]"
-            elif len(input_summary) > 100:
-                input_summary = input_summary[:100] + "..."
-
-            self.logger.info(f"Resuming execution {execution_id}. Stored input '{input_summary}' under key '{output_key}'.")
+            if self.logger.isEnabledFor(logging.INFO):
+                # Summarizing may stringify a large upload, so skip it when the record would be dropped.
+                input_summary = str(user_input)
+                if isinstance(user_input, list) and len(user_input) > 0:
+                    input_summary = f"[{len(user_input)} document(s)]"
+                elif len(input_summary) > 100:
+                    input_summary = input_summary[:100] + "..."
+                self.logger.info("Resuming execution %s. Stored input '%s' under key '%s'.", execution_id, input_summary, output_key)
             paused_state["step_history"].append({
                 'step_id': paused_step_id, 'type': 'human_input_provided',
                 'input_summary': str(user_input) # Avoid logging large file content
             })
         else:
-            self.logger.warning(f"Resuming execution {execution_id}, but the paused step had no output_key.")
+            self.logger.warning("Resuming execution %s, but the paused step had no output_key.", execution_id)
 
         next_step_id = paused_step.on_success
         paused_state["current_step_id"] = next_step_id
-        self.logger.info(f"Advancing state from '{paused_step_id}' to next step: '{next_step_id}'.")
+        self.logger.info("Advancing state from '%s' to next step: '%s'.", paused_step_id, next_step_id)
 
         return await self._run_execution_loop(workflow, paused_state)
 
@@ -224,14 +267,15 @@ class WorkflowEngine:
                 paused_step = workflow.get_step(result['state']['current_step_id'])
                 # Record what kind of pause this is
                 pause_type = result.get("pause_type", "awaiting_input")
-                result['state']['step_history'].append({
+                pause_entry = {
                     'step_id': paused_step.step_id,
                     'type': f'pause_{pause_type}',
                     'prompt': result['response'],
                     'output_key': result['output_key']
-                })
-                self.storage.save_execution_state(execution_id, workflow.id, "paused", result["state"])
-                self.logger.info(f"Execution {execution_id} paused for {pause_type} and state saved to DB.")
+                }
+                # The history append and state write commit together, on a worker thread to keep the event loop free.
+                await asyncio.to_thread(self.storage.save_paused_execution, execution_id, workflow.id, result["state"], pause_entry)
+                self.logger.info("Execution %s paused for %s and state saved to DB.", execution_id, pause_type)
 
                 # Construct response for the frontend
                 response_payload = {
@@ -245,12 +289,12 @@ class WorkflowEngine:
                     response_payload["max_files"] = result.get("max_files")
                 return response_payload
 
-            self.storage.delete_execution_state(execution_id)
+            await asyncio.to_thread(self.storage.delete_execution_state, execution_id)
             if status == "completed":
-                self.logger.info(f"Execution {execution_id} completed successfully.")
+                self.logger.info("Execution %s completed successfully.", execution_id)
                 return result
             else: # status == "failed"
-                self.logger.error(f"Execution {execution_id} failed: {result.get('error')}")
+                self.logger.error("Execution %s failed: %s", execution_id, result.get('error'))
                 return {
                     "status": "failed",
                     "error": result.get("error", "An unknown error occurred."),
@@ -258,7 +302,7 @@ class WorkflowEngine:
                 }
 
         except Exception as e:
-            self.logger.error(f"Critical error in execution loop for workflow '{workflow.name}': {e}", exc_info=True)
+            self.logger.error("Critical error in execution loop for workflow '%s': %s", workflow.name, e, exc_info=True)
             if 'state' in locals() and 'execution_id' in state:
                 self.storage.delete_execution_state(state['execution_id'])
             return {"status": "failed", "error": f"A critical system error occurred: {e}"}
@@ -267,7 +311,7 @@ class WorkflowEngine:
         """Generates a Mermaid.js diagram for a specified workflow."""
         workflow = self.storage.get_workflow(workflow_id)
         if not workflow:
-            self.logger.warning(f"Visualize request failed: Workflow ID {workflow_id} not found.")
+            self.logger.warning("Visualize request failed: Workflow ID %s not found.", workflow_id)
             return None
         return self.visualizer.generate_mermaid_diagram(workflow)
 
@@ -1,11 +1,75 @@
+import asyncio
+import os
+import re
 import sqlite3
 import logging
-from typing import List, Dict, Any, Tuple
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from operator import itemgetter
+from typing import Callable, Iterator, List, Dict, Any, Tuple
 
 from ..config import settings
 
 logger = logging.getLogger(__name__)
 
+# Open connections, one per (thread, database path). DatabaseManager instances are created per
+# request and per action, so the cache lives at module level to survive them; sqlite3
+# connections may not be shared across threads.
+_thread_connections = threading.local()
+# Every connection opened per database path, so DatabaseManager.close can reach those cached by
+# other threads. Closing bumps the path's generation, which makes each thread open a fresh one.
+_open_connections: Dict[str, List[sqlite3.Connection]] = {}
+_connection_generations: Dict[str, int] = {}
+_connections_lock = threading.Lock()
+
+# '-- line' and '/* block */' SQL comments, for telling a comment-only piece of a script from a statement.
+_SQL_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+# Database path -> (schema_version, schema) from the last list_tables_and_schema call.
+_schema_cache: Dict[str, Tuple[int, Dict[str, Dict[str, Tuple]]]] = {}
+
+@lru_cache(maxsize=256)
+def _compile_upsert(table_name: str, columns: Tuple[str, ...], primary_key_columns: Tuple[str, ...]) -> Tuple[str, Callable[[Dict[str, Any]], Tuple]]:
+    """
+    Compiles an upsert for one table and column layout: the SQL statement plus a function that
+    pulls a row's parameters out of its dict in column order. Cached, since callers repeat layouts.
+    """
+    sql = _build_upsert_sql(table_name, columns, primary_key_columns)
+    if len(columns) == 1:
+        column = columns[0]
+        return sql, lambda row: (row[column],)
+    return sql, itemgetter(*columns)
+
+
+def _build_upsert_sql(table_name: str, columns: Tuple[str, ...], primary_key_columns: Tuple[str, ...]) -> str:
+    """Builds the upsert statement for one table and column layout."""
+    values_placeholder = ", ".join(["?"] * len(columns))
+    pk_str = ", ".join(f'"{c}"' for c in primary_key_columns)
+
+    # One pass over the columns: every column is inserted, and the ones that are NOT part of
+    # the primary key are also updated on conflict.
+    pk_set = frozenset(primary_key_columns)
+    quoted_columns, update_parts = [], []
+    for col in columns:
+        quoted_columns.append(f'"{col}"')
+        if col not in pk_set:
+            update_parts.append(f'"{col}" = excluded."{col}"')
+    columns_str = ", ".join(quoted_columns)
+    update_placeholder = ", ".join(update_parts)
+
+    # If there's nothing to update (all keys are PKs), the update clause is empty
+    if not update_placeholder:
+        # A simple INSERT OR IGNORE is sufficient if there are no non-PK fields to update
+        return f'INSERT OR IGNORE INTO "{table_name}" ({columns_str}) VALUES ({values_placeholder});'
+    return (
+        f'INSERT INTO "{table_name}" ({columns_str}) VALUES ({values_placeholder}) '
+        f'ON CONFLICT({pk_str}) DO UPDATE SET {update_placeholder};'
+    )
+
+
 class DatabaseManager:
     """Handles all database operations for the application's structured data."""
 
@@ -15,15 +79,99 @@ class DatabaseManager:
         :param db_path: Path to the SQLite database file.
         """
         self.db_path = db_path
-        logger.info(f"DatabaseManager initialized for database at: {self.db_path}")
+        logger.info("DatabaseManager initialized for database at: %s", self.db_path)
+
+    def _get_connection(self, read_only: bool = False) -> sqlite3.Connection:
+        """
+        Returns this thread's connection to the database, opening it with the performance settings
+        applied on first use. Operations use it through 'with self._connection() as conn:', which
+        commits or rolls back (unless a transaction() is open) but keeps the connection open.
+        :param read_only: Return the thread's separate read-only connection, which rejects writes.
+        """
+        connections = getattr(_thread_connections, "by_path", None)
+        if connections is None:
+            connections = _thread_connections.by_path = {}
+        key = (self.db_path, read_only)
+        generation = _connection_generations.get(self.db_path, 0)
+        cached = connections.get(key)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
 
-    def _get_connection(self):
-        """Creates and returns a new database connection."""
-        conn = sqlite3.connect(self.db_path)
+        if read_only:
+            # mode=ro cannot create the file, so make sure the read-write side has opened it first.
+            self._get_connection()
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=30, cached_statements=512, check_same_thread=False)
+        else:
+            # Connections live for the whole thread, so a larger prepared-statement cache keeps every
+            # query and upsert shape the workflows use parsed.
+            # check_same_thread=False only lets close() run from another thread; each connection is
+            # still used by the one thread that opened it.
+            conn = sqlite3.connect(self.db_path, timeout=30, cached_statements=512, check_same_thread=False)
+            # WAL lets reads proceed during a write and only needs an fsync at checkpoints, so
+            # synchronous=NORMAL stays crash-safe. The mode is persistent and covers the read-only side too.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
         # Use Row factory to get rows as dictionary-like objects
         conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA busy_timeout=30000")
+        # Keep hot pages and temp tables in memory.
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MB
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        if read_only:
+            conn.execute("PRAGMA query_only=ON")
+        with _connections_lock:
+            _open_connections.setdefault(self.db_path, []).append(conn)
+        connections[key] = (generation, conn)
         return conn
 
+    def close(self):
+        """
+        Closes every thread's connections to this database, e.g. on shutdown. Threads that use
+        the database afterwards open new connections.
+        """
+        with _connections_lock:
+            _connection_generations[self.db_path] = _connection_generations.get(self.db_path, 0) + 1
+            connections = _open_connections.pop(self.db_path, [])
+        for conn in connections:
+            conn.close()
+        logger.info("Closed %s connection(s) to %s.", len(connections), self.db_path)
+
+    @contextmanager
+    def _connection(self, read_only: bool = False) -> Iterator[sqlite3.Connection]:
+        """
+        The connection for one operation, committed (or rolled back) when the block exits. While a
+        transaction() is open on this thread, yields its read-write connection without committing
+        instead, so the operation joins the transaction and reads see its uncommitted writes.
+        """
+        writer = self._get_connection()
+        if writer.in_transaction:
+            yield writer
+            return
+        with self._get_connection(read_only=read_only) as conn:
+            yield conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Runs a block of writes as one 'BEGIN IMMEDIATE' transaction on this thread's connection:
+        committed when the block exits, rolled back if it raises. Every operation of this manager
+        made inside the block (upserts, admin commands, queries) joins it instead of committing on
+        its own, so N related writes pay for one commit. A nested transaction() joins the outer one.
+        """
+        conn = self._get_connection()
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
     def execute_query(self, query: str, params: Tuple = ()) -> List[Dict[str, Any]]:
         """
         Executes a SELECT query and returns the results as a list of dictionaries.
@@ -31,19 +179,45 @@ class DatabaseManager:
         :param params: A tuple of parameters to safely bind to the query.
         :return: A list of dictionaries, where each dictionary represents a row.
         """
-        logger.info(f"Executing query: {query} with params: {params}")
+        logger.info("Executing query: %s with params: %s", query, params)
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                rows = cursor.fetchall()
-                # Convert sqlite3.Row objects to standard dictionaries
-                return [dict(row) for row in rows]
+            with self._connection(read_only=True) as conn:
+                return list(self._iter_rows(conn, query, params))
         except sqlite3.Error as e:
-            logger.error(f"Database query failed: {e}", exc_info=True)
+            logger.error("Database query failed: %s", e, exc_info=True)
             # Re-raise the exception so the caller can handle it
             raise e
 
+    def iter_query(self, query: str, params: Tuple = (), chunk_size: int = 1024) -> Iterator[Dict[str, Any]]:
+        """
+        Like execute_query, but yields rows as dictionaries while fetching them chunk_size at a
+        time, so a large result never has to be held in memory all at once.
+        """
+        logger.info("Executing streamed query: %s with params: %s", query, params)
+        writer = self._get_connection()
+        # Inside a transaction() the read-only connection could not see the block's own writes.
+        conn = writer if writer.in_transaction else self._get_connection(read_only=True)
+        return self._iter_rows(conn, query, params, chunk_size)
+
+    @staticmethod
+    def _iter_rows(conn: sqlite3.Connection, query: str, params: Tuple, chunk_size: int = 1024) -> Iterator[Dict[str, Any]]:
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(query, params)
+        columns = tuple(description[0] for description in cursor.description or ())
+        while rows := cursor.fetchmany(chunk_size):
+            yield from (dict(zip(columns, row)) for row in rows)
+
+    @staticmethod
+    def _fetch_dicts(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+        """
+        Fetches the remaining rows of an executed cursor as dictionaries. Column names are read
+        once from the cursor description and zipped onto plain tuples, skipping sqlite3.Row.
+        """
+        cursor.row_factory = None
+        columns = tuple(description[0] for description in cursor.description)
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
     def upsert_data(self, table_name: str, data: Dict[str, Any], primary_key_columns: List[str]):
         """
         Inserts a new row or updates an existing one based on the primary key.
@@ -51,64 +225,106 @@ class DatabaseManager:
         :param data: A dictionary where keys are column names and values are the data to be inserted/updated.
         :param primary_key_columns: A list of column names that form the primary key.
         """
+        return self.upsert_many(table_name, [data], primary_key_columns)
+
+    def upsert_many(self, table_name: str, rows: List[Dict[str, Any]], primary_key_columns: List[str]) -> int:
+        """
+        Upserts many rows with one prepared statement in a single transaction, so a bulk load
+        pays for one commit instead of one per row.
+        :param table_name: The name of the table to upsert into.
+        :param rows: Dictionaries of column name to value. Every row must have the same columns.
+        :param primary_key_columns: A list of column names that form the primary key.
+        :return: The number of rows inserted or updated.
+        """
         if not primary_key_columns:
             raise ValueError("Primary key columns must be specified for an upsert operation.")
+        if not rows:
+            return 0
 
-        columns = list(data.keys())
-        values_placeholder = ", ".join(["?"] * len(columns))
-        columns_str = ", ".join(f'"{c}"' for c in columns)
-        pk_str = ", ".join(f'"{c}"' for c in primary_key_columns)
+        columns = tuple(rows[0].keys())
+        column_set = set(columns)
+        if any(row.keys() != column_set for row in rows):
+            raise ValueError("All rows in an upsert must have the same columns.")
 
-        # Columns to update are all columns that are NOT part of the primary key
-        update_columns = [col for col in columns if col not in primary_key_columns]
-        update_placeholder = ", ".join([f'"{col}" = excluded."{col}"' for col in update_columns])
-
-        # If there's nothing to update (all keys are PKs), the update clause is empty
-        if not update_placeholder:
-            # A simple INSERT OR IGNORE is sufficient if there are no non-PK fields to update
-            sql = f'INSERT OR IGNORE INTO "{table_name}" ({columns_str}) VALUES ({values_placeholder});'
-        else:
-            sql = (
-                f'INSERT INTO "{table_name}" ({columns_str}) VALUES ({values_placeholder}) '
-                f'ON CONFLICT({pk_str}) DO UPDATE SET {update_placeholder};'
-            )
-
-        params = tuple(data.values())
-        logger.info(f"Executing upsert: {sql} with params: {params}")
+        sql, params_of = _compile_upsert(table_name, columns, tuple(primary_key_columns))
+        # Building the params tuple for the log line is not free, so skip it when INFO is off.
+        if len(rows) == 1 and logger.isEnabledFor(logging.INFO):
+            logger.info("Executing upsert: %s with params: %s", sql, params_of(rows[0]))
+        elif len(rows) > 1:
+            logger.info("Executing upsert of %s rows: %s", len(rows), sql)
 
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(sql, params)
-                conn.commit()
+            with self.transaction() as conn:
+                cursor = conn.executemany(sql, map(params_of, rows))
                 rows_affected = cursor.rowcount
                 guaranteed_rows_affected = max(0, rows_affected) if rows_affected is not None else 0
 
-                logger.info(f"Upsert successful for table '{table_name}'. Driver rowcount: {rows_affected}, Guaranteed rows_affected: {guaranteed_rows_affected}")
-                return guaranteed_rows_affected
+            logger.info("Upsert successful for table '%s'. Driver rowcount: %s, Guaranteed rows_affected: %s", table_name, rows_affected, guaranteed_rows_affected)
+            return guaranteed_rows_affected
         except sqlite3.Error as e:
-            logger.error(f"Database upsert failed: {e}", exc_info=True)
+            logger.error("Database upsert failed: %s", e, exc_info=True)
             raise e
 
-    def list_tables_and_schema(self) -> Dict[str, List[Dict[str, Any]]]:
+    def list_tables_and_schema(self, columnar: bool = False) -> Dict[str, Any]:
         """
         Retrieves a list of all tables and their schemas in the database.
+        :param columnar: Return each table's schema as one list per PRAGMA table_info field
+            (e.g. {"name": [...], "type": [...], "pk": [...]}) instead of one dict per column.
         :return: A dictionary where keys are table names and values are lists of column info.
         """
-        with self._get_connection() as conn:
+        with self._connection(read_only=True) as conn:
             cursor = conn.cursor()
-            # Get list of tables
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = [row['name'] for row in cursor.fetchall()]
+            cursor.row_factory = None
+            # schema_version changes with every schema change, from any connection, so an
+            # unchanged version means the cached schema is still exact.
+            schema_version = cursor.execute("PRAGMA schema_version;").fetchone()[0]
+            cached = _schema_cache.get(self.db_path)
+            if cached is None or cached[0] != schema_version:
+                # Get list of tables
+                cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+                tables = [row[0] for row in cursor.fetchall()]
 
-            schema_info = {}
-            for table_name in tables:
-                # Get schema for each table
-                cursor.execute(f'PRAGMA table_info("{table_name}");')
-                columns = cursor.fetchall()
-                schema_info[table_name] = [dict(col) for col in columns]
+                schema_info = {}
+                for table_name in tables:
+                    # Get schema for each table
+                    rows = cursor.execute(f'PRAGMA table_info("{table_name}");').fetchall()
+                    fields = [description[0] for description in cursor.description]
+                    # Stored column-wise: one tuple per field, built with a single transpose.
+                    schema_info[table_name] = dict(zip(fields, zip(*rows))) if rows else dict.fromkeys(fields, ())
+                cached = (schema_version, schema_info)
+                # A schema seen inside an open transaction may still be rolled back, so it is not cached.
+                if not conn.in_transaction:
+                    _schema_cache[self.db_path] = cached
 
-            return schema_info
+        # Hand out fresh containers so callers cannot modify the cached entry.
+        if columnar:
+            return {table_name: {field: list(values) for field, values in table.items()} for table_name, table in cached[1].items()}
+        return {table_name: self._schema_rows(table) for table_name, table in cached[1].items()}
+
+    @staticmethod
+    def _schema_rows(table: Dict[str, Tuple]) -> List[Dict[str, Any]]:
+        """Turns a column-wise table schema back into one dict per column, as PRAGMA table_info reports it."""
+        fields = tuple(table)
+        return [dict(zip(fields, values)) for values in zip(*table.values())]
+
+    @staticmethod
+    def _split_statements(sql: str) -> List[str]:
+        """
+        Splits a script into its statements. A ';' only ends a statement when SQLite agrees the
+        text so far is complete, so semicolons inside string literals or triggers are kept. Pieces
+        holding only comments (e.g. a trailing '-- note') are dropped; executed on their own they
+        would reset the cursor's result set.
+        """
+        statements, current = [], ""
+        for piece in sql.split(";"):
+            current += piece + ";"
+            if sqlite3.complete_statement(current):
+                if _SQL_COMMENT_RE.sub("", current).strip(" \t\r\n;"):
+                    statements.append(current)
+                current = ""
+        if _SQL_COMMENT_RE.sub("", current).strip(" \t\r\n;"):
+            statements.append(current.rstrip(";"))
+        return statements
 
     def execute_admin_command(self, sql: str) -> Dict[str, Any]:
         """
@@ -117,34 +333,62 @@ class DatabaseManager:
         :param sql: The raw SQL command to execute.
         :return: A dictionary containing status and results/error message.
         """
-        logger.warning(f"Executing admin SQL command: {sql}")
+        logger.warning("Executing admin SQL command: %s", sql)
         try:
-            with self._get_connection() as conn:
+            with self._connection() as conn:
                 cursor = conn.cursor()
-                # Use executescript for multi-statement commands
-                cursor.executescript(sql)
-                conn.commit()
-
-                # Try to fetch results if it was a SELECT-like query
-                # This is a bit tricky with executescript, so we'll re-execute the last statement
-                # This part is simplified and might not capture all results perfectly, but works for single statements.
-                try:
-                    # Re-run the command to fetch potential output
-                    cursor.execute(sql)
-                    rows = cursor.fetchall()
-                    return {
-                        "status": "success",
-                        "message": "Command executed successfully.",
-                        "results": [dict(row) for row in rows]
-                    }
-                except (sqlite3.Error, TypeError):
-                    # This will happen on non-SELECT statements (CREATE, INSERT, etc.)
+                # Each statement runs exactly once; only the last one's rows are returned.
+                for statement in self._split_statements(sql):
+                    cursor.execute(statement)
+                if cursor.description is None:
+                    # Non-SELECT statements (CREATE, INSERT, etc.) produce no result set
                     return {
                         "status": "success",
                         "message": "Command executed successfully. No results to display.",
                         "results": []
                     }
+                return {
+                    "status": "success",
+                    "message": "Command executed successfully.",
+                    "results": self._fetch_dicts(cursor)
+                }
 
         except sqlite3.Error as e:
-            logger.error(f"Admin SQL command failed: {e}", exc_info=True)
-            return {"status": "error", "message": str(e), "results": []}
\ No newline at end of file
+            logger.error("Admin SQL command failed: %s", e, exc_info=True)
+            return {"status": "error", "message": str(e), "results": []}
+
+
+class AsyncDatabaseManager:
+    """
+    Async facade over DatabaseManager for use from workflow actions. Each call runs on a worker
+    thread so a slow query never blocks the event loop. Writes share a single thread, which
+    serializes them instead of letting them contend for SQLite's write lock; reads use a small pool.
+    """
+
+    _write_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-w")
+    _read_pool = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="sqlite-r")
+
+    def __init__(self, db_path: str = settings.DATA_DB_PATH):
+        self.sync = DatabaseManager(db_path)
+
+    async def _run(self, pool: ThreadPoolExecutor, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(pool, partial(func, *args))
+
+    async def execute_query(self, query: str, params: Tuple = ()) -> List[Dict[str, Any]]:
+        return await self._run(self._read_pool, self.sync.execute_query, query, params)
+
+    async def upsert_data(self, table_name: str, data: Dict[str, Any], primary_key_columns: List[str]) -> int:
+        return await self._run(self._write_pool, self.sync.upsert_data, table_name, data, primary_key_columns)
+
+    async def upsert_many(self, table_name: str, rows: List[Dict[str, Any]], primary_key_columns: List[str]) -> int:
+        return await self._run(self._write_pool, self.sync.upsert_many, table_name, rows, primary_key_columns)
+
+    async def run_in_transaction(self, func: Callable[[DatabaseManager], Any]) -> Any:
+        """
+        Calls func(db) on the write thread inside one DatabaseManager.transaction(), so all of its
+        writes commit together. func is synchronous: the transaction never stays open across an await.
+        """
+        def run():
+            with self.sync.transaction():
+                return func(self.sync)
+        return await self._run(self._write_pool, run)
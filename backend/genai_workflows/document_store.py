@@ -0,0 +1,50 @@
+import mmap
+import os
+from typing import List
+
+import numpy as np
+
+
+def write_documents(docs_path: str, offsets_path: str, documents: List[str]) -> None:
+    """
+    Writes documents as concatenated UTF-8 bytes plus an (N + 1) int64 offsets array, so a reader
+    can decode document i from bytes offsets[i]:offsets[i + 1] without touching the others.
+    Each file is written beside its target and renamed into place, so a DocumentStore still
+    mapping the previous files (e.g. a cached collection being re-ingested) keeps reading them
+    instead of a file truncated underneath it.
+    """
+    encoded = [document.encode("utf-8") for document in documents]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(blob) for blob in encoded], out=offsets[1:])
+
+    with open(f"{docs_path}.tmp", "wb") as f:
+        f.writelines(encoded)
+    # Saving through a file object keeps numpy from appending ".npy" to the name.
+    with open(f"{offsets_path}.tmp", "wb") as f:
+        np.save(f, offsets)
+    os.replace(f"{offsets_path}.tmp", offsets_path)
+    os.replace(f"{docs_path}.tmp", docs_path)
+
+
+class DocumentStore:
+    """
+    Read-only, memory-mapped view over documents written by write_documents. Supports len() and
+    indexing like the list it replaces, but only decodes the documents actually requested.
+    """
+
+    def __init__(self, docs_path: str, offsets_path: str):
+        self._offsets = np.load(offsets_path, mmap_mode="r")
+        if os.path.getsize(docs_path):
+            with open(docs_path, "rb") as f:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._data = b""  # mmap refuses empty files
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        if not 0 <= i < len(self):
+            raise IndexError(f"Document index {i} out of range.")
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return self._data[start:end].decode("utf-8")
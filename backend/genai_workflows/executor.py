@@ -1,12 +1,16 @@
-import json
+import asyncio
+import inspect
 import logging
-from typing import Dict, Any, TYPE_CHECKING
+from typing import Callable, Dict, Any, List, Optional, TYPE_CHECKING
 
 from .workflow import Workflow, WorkflowStep
 from .storage import WorkflowStorage
+from .serialization import _dumps
 from ..tools import ToolRegistry
 from ..config import settings
 
+from .actions.base_executor import stream_callback as stream_callback_var, _truncate_for_prompt
+
 # --- Import all the individual action classes ---
 from .actions.agentic_tool_use_executor import AgenticToolUseAction
 from .actions.condition_check_executor import ConditionCheckAction
@@ -30,6 +34,49 @@ from .actions.display_message_executor import DisplayMessageAction
 if TYPE_CHECKING:
     from .core import WorkflowEngine
 
+# Byte budget for the step history quoted in the final-summary prompt. The newest entries are
+# kept verbatim; older ones are reduced to a one-line step id and outcome once the budget is spent.
+FINAL_RESPONSE_HISTORY_BYTES = 32_000
+# At most this many of those one-line entries are listed; anything older is only counted.
+FINAL_RESPONSE_SUMMARY_LINES = 50
+
+# History entry types whose output the chat UI shows to the user, so they are never compacted.
+HISTORY_DISPLAYED_TYPES = frozenset({"display_message", "llm_response"})
+# Entry fields that can hold large values (tool results, uploaded file text) and are cut when compacted.
+HISTORY_COMPACTED_FIELDS = ("output", "input_summary")
+
+# Action types that neither pause for input nor write anywhere outside the execution state,
+# so loop iterations made only of these can run concurrently. http_request qualifies only
+# for GET requests (checked separately).
+PARALLEL_SAFE_LOOP_ACTIONS = frozenset({
+    "llm_response", "condition_check", "intelligent_router", "vector_db_query",
+    "cross_encoder_rerank", "database_query", "display_message", "http_request", "end_loop",
+})
+
+
+# The action registry maps action_type strings to their handler classes. Built once at import;
+# each executor instantiates every class exactly once.
+ACTION_CLASSES = {
+    "agentic_tool_use": AgenticToolUseAction,
+    "condition_check": ConditionCheckAction,
+    "cross_encoder_rerank": CrossEncoderRerankAction,
+    "file_storage": FileStorageAction,
+    "file_ingestion": FileIngestionAction,
+    "human_input": HumanInputAction,
+    "llm_response": LlmResponseAction,
+    "vector_db_ingestion": VectorDbIngestionAction,
+    "vector_db_query": VectorDbQueryAction,
+    "workflow_call": WorkflowCallAction,
+    "http_request": HttpRequestAction,
+    "intelligent_router": IntelligentRouterAction,
+    "database_save": DatabaseSaveAction,
+    "database_query": DatabaseQueryAction,
+    "direct_tool_call": DirectToolCallAction,
+    "start_loop": StartLoopAction,
+    "end_loop": EndLoopAction,
+    "display_message": DisplayMessageAction,
+}
+
 
 class WorkflowExecutor:
     """
@@ -46,61 +93,68 @@ class WorkflowExecutor:
         self.engine = engine # The engine itself, needed for sub-workflow calls
         self.logger = logging.getLogger(__name__)
 
-        # --- The action registry maps action_type strings to their handler classes ---
-        action_classes = {
-            "agentic_tool_use": AgenticToolUseAction,
-            "condition_check": ConditionCheckAction,
-            "cross_encoder_rerank": CrossEncoderRerankAction,
-            "file_storage": FileStorageAction,
-            "file_ingestion": FileIngestionAction,
-            "human_input": HumanInputAction,
-            "llm_response": LlmResponseAction,
-            "vector_db_ingestion": VectorDbIngestionAction,
-            "vector_db_query": VectorDbQueryAction,
-            "workflow_call": WorkflowCallAction,
-            "http_request": HttpRequestAction,
-            "intelligent_router": IntelligentRouterAction,
-            "database_save": DatabaseSaveAction,
-            "database_query": DatabaseQueryAction,
-            "direct_tool_call": DirectToolCallAction,
-            "start_loop": StartLoopAction,
-            "end_loop": EndLoopAction,
-            "display_message": DisplayMessageAction,
-        }
-
         self.action_executors = {
             action_type: cls(self.client, self.tool_registry, self.engine)
-            for action_type, cls in action_classes.items()
+            for action_type, cls in ACTION_CLASSES.items()
+        }
+        # Resolved once here so dispatch only awaits executors that are actually coroutines.
+        self.async_action_types = frozenset(
+            action_type for action_type, executor in self.action_executors.items()
+            if inspect.iscoroutinefunction(executor.execute)
+        )
+        # action_type -> (bound execute method, whether it returns a coroutine): one lookup per step.
+        self._handlers = {
+            action_type: (executor.execute, action_type in self.async_action_types)
+            for action_type, executor in self.action_executors.items()
         }
-        self.logger.info(f"Initialized {len(self.action_executors)} action executors.")
+        self.logger.info("Initialized %s action executors.", len(self.action_executors))
 
-    async def execute(self, workflow: Workflow, execution_state: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute(self, workflow: Workflow, execution_state: Dict[str, Any], stream_callback: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Executes or resumes a workflow from a given state.
         This method will run until the workflow completes, fails, or pauses for input.
+        :param stream_callback: Called with each chunk of text as llm_response steps generate it.
+            Step outputs are unchanged; this only delivers the text earlier.
         """
-        self.logger.info(f"Executing workflow '{workflow.name}' from step '{execution_state['current_step_id']}'")
+        if stream_callback is None:
+            return await self._execute(workflow, execution_state)
+        token = stream_callback_var.set(stream_callback)
+        try:
+            return await self._execute(workflow, execution_state)
+        finally:
+            stream_callback_var.reset(token)
+
+    async def _execute(self, workflow: Workflow, execution_state: Dict[str, Any]) -> Dict[str, Any]:
+        self.logger.info("Executing workflow '%s' from step '%s'", workflow.name, execution_state['current_step_id'])
 
         # The stack will hold the step_id of the 'start_loop' node that initiated a sub-graph execution.
         loop_context_stack = []
+        # Steps are already indexed by id; binding the dict saves a method call per step.
+        steps = workflow.steps
 
         try:
             while execution_state["current_step_id"] and execution_state["current_step_id"] != 'END':
-                step = workflow.get_step(execution_state["current_step_id"])
+                step = steps.get(execution_state["current_step_id"])
                 if not step:
                     error_msg = f"Step '{execution_state['current_step_id']}' not found in workflow '{workflow.name}'. Terminating."
                     self.logger.error(error_msg)
                     return {"status": "failed", "error": error_msg, "state": execution_state}
 
                 # --- Delegate to the appropriate action class ---
-                result = await self._execute_step(step, execution_state)
+                result = None
+                if step.action_type == "start_loop":
+                    result = await self._run_batched_query_loop(workflow, step, execution_state)
+                    if result is None and (step.parallel_degree or 1) > 1:
+                        result = await self._run_parallel_loop(workflow, step, execution_state)
+                elif step.action_type == "parallel_group":
+                    result = await self._run_parallel_group(workflow, step, execution_state)
+                if result is None:
+                    result = await self._execute_step(step, execution_state)
 
-                if result.get("status") == "start_loop_iteration":
-                    # The StartLoopAction wants to begin a sub-graph execution.
-                    loop_context_stack.append(step.step_id)
-                    execution_state["current_step_id"] = result.get("next_step_override")
-                    self.logger.info(f"Entering loop body. Pushed '{step.step_id}' to context stack. Next step: '{execution_state['current_step_id']}'")
-                    continue # Immediately start the loop body without storing output yet
+                if result.get("status") == "failed":
+                    # A parallel loop iteration failed with no 'on_failure' path, ending the workflow as it would sequentially.
+                    self._trim_history(execution_state)
+                    return {"status": "failed", "error": result.get("error"), "state": execution_state}
 
                 if result.get("status") == "loop_iteration_complete":
                     # The EndLoopAction signals the end of an iteration.
@@ -108,12 +162,21 @@ class WorkflowExecutor:
                         error_msg = "Encountered an 'end_loop' node without a 'start_loop' context. Check workflow structure."
                         return {"status": "failed", "error": error_msg, "state": execution_state}
 
-                    # Return control to the 'start_loop' node that is on top of the stack.
+                    # Return control to the 'start_loop' node that is on top of the stack. The loop is
+                    # advanced in place; its result (next iteration or completion) is handled below.
                     start_loop_step_id = loop_context_stack.pop()
-                    execution_state["current_step_id"] = start_loop_step_id
                     execution_state["step_history"].append(result) # Record the end_loop result for aggregation
-                    self.logger.info(f"Exiting loop body. Popped context. Returning to '{start_loop_step_id}' to continue loop.")
-                    continue # Immediately jump back to the start_loop node
+                    self._trim_history(execution_state)
+                    self.logger.info("Exiting loop body. Popped context. Returning to '%s' to continue loop.", start_loop_step_id)
+                    step = steps[start_loop_step_id]
+                    result = self.action_executors["start_loop"].advance(step, execution_state, result.get("output"))
+
+                if result.get("status") == "start_loop_iteration":
+                    # The StartLoopAction wants to begin a sub-graph execution.
+                    loop_context_stack.append(step.step_id)
+                    execution_state["current_step_id"] = result.get("next_step_override")
+                    self.logger.info("Entering loop body. Pushed '%s' to context stack. Next step: '%s'", step.step_id, execution_state['current_step_id'])
+                    continue # Immediately start the loop body without storing output yet
 
                 if result.get("status") in ["awaiting_input", "awaiting_file_upload"]:
                     response_payload = {
@@ -127,9 +190,10 @@ class WorkflowExecutor:
 
                 if step.output_key and result.get("success") and "output" in result:
                     execution_state["collected_inputs"][step.output_key] = result["output"]
-                    self.logger.info(f"Step '{step.step_id}' output stored in 'collected_inputs' under key '{step.output_key}'.")
+                    self.logger.info("Step '%s' output stored in 'collected_inputs' under key '%s'.", step.step_id, step.output_key)
 
                 execution_state["step_history"].append(result)
+                self._trim_history(execution_state)
 
                 if result.get("success"):
                     # Check for a dynamic override from the router first
@@ -156,34 +220,290 @@ class WorkflowExecutor:
                 "state": execution_state
             }
         except Exception as e:
-            self.logger.error(f"A critical error occurred during execution of workflow '{workflow.name}': {e}", exc_info=True)
+            self.logger.error("A critical error occurred during execution of workflow '%s': %s", workflow.name, e, exc_info=True)
             return {"status": "failed", "error": str(e), "state": execution_state}
 
 
+    @staticmethod
+    def _trim_history(state: Dict[str, Any]):
+        """
+        Keeps only the newest STEP_HISTORY_LIMIT history entries. step_history_offset counts the
+        entries dropped from the front, so positions in the list still map to absolute step numbers.
+        Entries older than the newest STEP_HISTORY_FULL_ENTRIES are then compacted.
+        """
+        history = state["step_history"]
+        excess = len(history) - settings.STEP_HISTORY_LIMIT
+        if excess > 0:
+            del history[:excess]
+            state["step_history_offset"] = state.get("step_history_offset", 0) + excess
+        WorkflowExecutor._compact_history(state)
+
+    @staticmethod
+    def _compact_history(state: Dict[str, Any]):
+        """
+        Truncates the bulky fields of history entries once they fall out of the newest
+        STEP_HISTORY_FULL_ENTRIES, so large tool results are not held for the rest of the execution.
+        step_history_compacted is the absolute step number compaction has reached, so each entry is
+        visited once. collected_inputs keeps the full values.
+        """
+        history = state["step_history"]
+        offset = state.get("step_history_offset", 0)
+        start = max(state.get("step_history_compacted", 0), offset)
+        end = offset + len(history) - settings.STEP_HISTORY_FULL_ENTRIES
+        if end <= start:
+            return
+        for entry in history[start - offset:end - offset]:
+            if entry.get("type") in HISTORY_DISPLAYED_TYPES:
+                continue
+            for field in HISTORY_COMPACTED_FIELDS:
+                if field in entry:
+                    entry[field] = _truncate_for_prompt(entry[field], settings.STEP_HISTORY_COMPACT_CHARS)
+        state["step_history_compacted"] = end
+
     async def _execute_step(self, step: WorkflowStep, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         This method now looks up the pre-instantiated action executor and calls its
         execute method.
         """
-        self.logger.info(f"Dispatching step '{step.step_id}' to handler for type '{step.action_type}'.")
+        self.logger.info("Dispatching step '%s' to handler for type '%s'.", step.step_id, step.action_type)
 
-        action_executor = self.action_executors.get(step.action_type)
+        handler = self._handlers.get(step.action_type)
 
-        if not action_executor:
-            self.logger.warning(f"No action executor found for type: {step.action_type}")
+        if not handler:
+            self.logger.warning("No action executor found for type: %s", step.action_type)
             return {"step_id": step.step_id, "success": False, "error": f"Unknown action type: {step.action_type}"}
 
         try:
             # Call the execute method on the existing instance
-            return await action_executor.execute(step, state)
+            execute, is_async = handler
+            result = execute(step, state)
+            if is_async:
+                result = await result
+            return result
         except Exception as e:
-            self.logger.error(f"Error executing action for step '{step.step_id}': {e}", exc_info=True)
+            self.logger.error("Error executing action for step '%s': %s", step.step_id, e, exc_info=True)
             return {"step_id": step.step_id, "success": False, "error": f"Critical error in action '{step.action_type}': {e}"}
 
 
+    async def _run_batched_query_loop(self, workflow: Workflow, step: WorkflowStep, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Runs a loop whose body is a single vector_db_query feeding straight into end_loop as one
+        batched search instead of one embedding request and FAISS search per item. Returns the
+        loop's completion result, or None if the loop does not qualify (or the batch fails) and
+        should run iteration by iteration as usual.
+        """
+        if f"__loop_state_{step.step_id}" in state["collected_inputs"]:
+            return None  # Already iterating; never switch strategies mid-loop.
+
+        query_step = workflow.get_step(step.loop_body_start_step_id)
+        if not query_step or query_step.action_type != "vector_db_query":
+            return None
+        end_step = workflow.get_step(query_step.on_success)
+        if not end_step or end_step.action_type != "end_loop" or end_step.value_to_return:
+            return None
+
+        query_executor = self.action_executors["vector_db_query"]
+        collection = query_executor._get_value_from_state(step.input_collection_variable, state)
+        if not isinstance(collection, list):
+            return None  # Let StartLoopAction report the error.
+
+        # Render each iteration's query exactly as the sequential loop would.
+        queries = []
+        for item in collection:
+            state["collected_inputs"][step.current_item_output_key] = item
+            query = query_executor._fill_prompt_template(query_step.prompt_template, state)
+            if not query or not isinstance(query, str):
+                return None
+            queries.append(query)
+
+        self.logger.info("Loop '%s': running %s vector queries as one batch.", step.step_id, len(queries))
+        result = await query_executor.execute_many(query_step, state, queries)
+        if not result.get("success"):
+            self.logger.warning("Batched loop query failed, falling back to sequential iterations: %s", result.get('error'))
+            return None
+
+        outputs = result["output"]
+        if query_step.output_key and outputs:
+            state["collected_inputs"][query_step.output_key] = outputs[-1]
+        state["step_history"].append(result)
+        return {"step_id": step.step_id, "success": True, "type": "start_loop_complete", "output": outputs}
+
+    def _loop_body_is_parallel_safe(self, workflow: Workflow, loop_step: WorkflowStep) -> bool:
+        """Walks every path from the loop body's first step and checks that each step is side-effect free."""
+        pending, seen = [loop_step.loop_body_start_step_id], set()
+        while pending:
+            step_id = pending.pop()
+            if not step_id or step_id == 'END' or step_id in seen:
+                continue
+            seen.add(step_id)
+            step = workflow.get_step(step_id)
+            if not step or step.action_type not in PARALLEL_SAFE_LOOP_ACTIONS:
+                return False
+            if step.action_type == "http_request" and (step.http_method or "GET").upper() != "GET":
+                return False
+            if step.action_type != "end_loop":
+                pending.extend([step.on_success, step.on_failure, *(step.routes or {}).values()])
+        return True
+
+    async def _run_parallel_loop(self, workflow: Workflow, step: WorkflowStep, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Runs up to `parallel_degree` loop iterations at once. Each iteration gets its own copy of
+        collected_inputs and step_history; results are returned in input order, and the
+        iterations' history entries and inputs are merged back as if they had run sequentially.
+        If an iteration fails, the ones after it are cancelled, history is merged up to and
+        including the failed one, and a workflow-level failure ({"status": "failed"}) is returned,
+        as the sequential loop would end the workflow. Streaming is off inside iterations, since
+        their text would interleave. Returns None if the loop does not qualify, so it runs through
+        StartLoopAction as usual.
+        """
+        if f"__loop_state_{step.step_id}" in state["collected_inputs"]:
+            return None  # Already iterating; never switch strategies mid-loop.
+        if not self._loop_body_is_parallel_safe(workflow, step):
+            self.logger.info("Loop '%s' body has side effects; running iterations sequentially.", step.step_id)
+            return None
+
+        collection = self.action_executors["start_loop"]._get_value_from_state(step.input_collection_variable, state)
+        if not isinstance(collection, list):
+            return None  # Let StartLoopAction report the error.
+
+        semaphore = asyncio.Semaphore(step.parallel_degree)
+        history_length = len(state["step_history"])
+        iteration_states = [
+            {
+                **state,
+                "collected_inputs": {**state["collected_inputs"], step.current_item_output_key: item},
+                "step_history": list(state["step_history"]),
+            }
+            for item in collection
+        ]
+
+        async def run_iteration(iteration_state: Dict[str, Any]) -> Any:
+            stream_callback_var.set(None)  # Only affects this iteration's task context
+            async with semaphore:
+                return await self._run_loop_body(workflow, step, iteration_state)
+
+        self.logger.info("Loop '%s': running %s iterations, %s at a time.", step.step_id, len(collection), step.parallel_degree)
+        tasks = [asyncio.create_task(run_iteration(iteration_state)) for iteration_state in iteration_states]
+        try:
+            if tasks:
+                await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            failed_at = next((i for i, task in enumerate(tasks) if task.done() and not task.cancelled() and task.exception()), None)
+            if failed_at is not None:
+                # The sequential loop would never have started the iterations after the failed one.
+                for task in tasks[failed_at + 1:]:
+                    task.cancel()
+                await asyncio.gather(*tasks[failed_at + 1:], return_exceptions=True)
+                # Iterations before the failed one may still be running; let them finish.
+                await asyncio.gather(*tasks[:failed_at], return_exceptions=True)
+                failed_at = next(i for i, task in enumerate(tasks) if not task.cancelled() and task.exception())
+        finally:
+            # If this execution is itself cancelled, do not leave its iterations running.
+            for task in tasks:
+                task.cancel()
+
+        merged = iteration_states if failed_at is None else iteration_states[:failed_at + 1]
+        for iteration_state in merged:
+            state["step_history"].extend(iteration_state["step_history"][history_length:])
+            state["collected_inputs"].update(iteration_state["collected_inputs"])
+
+        if failed_at is not None:
+            error = tasks[failed_at].exception()
+            self.logger.error("Loop '%s' iteration %s failed: %s", step.step_id, failed_at, error)
+            return {"status": "failed", "step_id": step.step_id, "error": str(error)}
+
+        results = [task.result() for task in tasks]
+        return {"step_id": step.step_id, "success": True, "type": "start_loop_complete", "output": results}
+
+    async def _run_parallel_group(self, workflow: Workflow, step: WorkflowStep, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Runs every branch step of a 'parallel_group' concurrently. Each branch sees its own shallow
+        copy of the execution state; branch outputs are merged back under their (disjoint, see
+        Workflow.validate_parallel_groups) output keys and their results recorded in branch order.
+        The group's output maps each branch step_id to that branch's output.
+        """
+        branch_steps = [workflow.get_step(branch_id) for branch_id in step.branches or []]
+        if not branch_steps or None in branch_steps:
+            return {"step_id": step.step_id, "success": False, "error": f"Parallel group '{step.step_id}' has missing or no branch steps."}
+
+        semaphore = asyncio.Semaphore(settings.PARALLEL_GROUP_MAX_CONCURRENCY)
+
+        async def run_branch(branch: WorkflowStep) -> Dict[str, Any]:
+            branch_state = {**state, "collected_inputs": dict(state["collected_inputs"]), "step_history": list(state["step_history"])}
+            async with semaphore:
+                return await self._execute_step(branch, branch_state)
+
+        self.logger.info("Parallel group '%s': running %s branches concurrently.", step.step_id, len(branch_steps))
+        results = await asyncio.gather(*(run_branch(branch) for branch in branch_steps))
+
+        outputs, errors = {}, []
+        for branch, result in zip(branch_steps, results):
+            state["step_history"].append(result)
+            if result.get("success"):
+                outputs[branch.step_id] = result.get("output")
+                if branch.output_key and "output" in result:
+                    state["collected_inputs"][branch.output_key] = result["output"]
+            else:
+                errors.append(f"'{branch.step_id}': {result.get('error', 'did not complete')}")
+        self._trim_history(state)
+
+        if errors:
+            return {"step_id": step.step_id, "success": False, "error": f"Parallel group branches failed: {'; '.join(errors)}", "output": outputs}
+        return {"step_id": step.step_id, "success": True, "type": "parallel_group", "output": outputs}
+
+    async def _run_loop_body(self, workflow: Workflow, loop_step: WorkflowStep, state: Dict[str, Any]) -> Any:
+        """Runs one loop iteration's sub-graph until its end_loop node and returns the iteration's value."""
+        current_step_id = loop_step.loop_body_start_step_id
+        while current_step_id and current_step_id != 'END':
+            step = workflow.get_step(current_step_id)
+            result = await self._execute_step(step, state)
+            state["step_history"].append(result)
+
+            if result.get("status") == "loop_iteration_complete":
+                return result.get("output")
+
+            if step.output_key and result.get("success") and "output" in result:
+                state["collected_inputs"][step.output_key] = result["output"]
+
+            if result.get("success"):
+                current_step_id = result.get("next_step_override") or step.on_success
+            elif step.on_failure:
+                current_step_id = step.on_failure
+            else:
+                raise RuntimeError(result.get("error") or f"Step '{step.step_id}' failed with no 'on_failure' path.")
+
+        raise RuntimeError(f"Loop '{loop_step.step_id}' body ended without reaching an 'end_loop' node.")
+
+    @staticmethod
+    def _summarize_history(history: List[Dict[str, Any]], max_bytes: int, offset: int = 0) -> str:
+        """
+        Describes the step history for the final-summary prompt. The newest entries are quoted as
+        a JSON array within max_bytes; older ones are listed as 'n: step_id [type] ok|FAIL' lines,
+        numbered from offset, and never serialized at all.
+        """
+        verbatim, used = [], 0
+        for entry in reversed(history):
+            text = _dumps(entry)
+            if used + len(text) > max_bytes:
+                break
+            verbatim.append(text)
+            used += len(text)
+        latest = "[" + ",".join(reversed(verbatim)) + "]"
+
+        older = len(history) - len(verbatim)
+        if not older:
+            return latest
+        first = max(0, older - FINAL_RESPONSE_SUMMARY_LINES)
+        lines = [f"({offset + first} earlier steps omitted)"] if offset + first else []
+        lines.extend(
+            f"{offset + i}: {entry.get('step_id')} [{entry.get('type', '?')}] {'ok' if entry.get('success') else 'FAIL'}"
+            for i, entry in enumerate(history[first:older], start=first)
+        )
+        return "Earlier steps:\n" + "\n".join(lines) + "\nLatest steps: " + latest
+
     async def _generate_final_response(self, state: Dict[str, Any]) -> str:
         """This method remains as it's a general utility for the end of a workflow."""
-        prompt = f"Based on the user's query '{state.get('query')}' and the actions taken, provide a concise final summary. History: {json.dumps(state.get('step_history', []), default=str)}"
+        history = self._summarize_history(state.get('step_history', []), FINAL_RESPONSE_HISTORY_BYTES, state.get('step_history_offset', 0))
+        prompt = f"Based on the user's query '{state.get('query')}' and the actions taken, provide a concise final summary. History: {history}"
         try:
             response = await self.client.chat.completions.create(
                 model=settings.DEFAULT_MODEL,
@@ -192,5 +512,5 @@ class WorkflowExecutor:
             )
             return response.choices[0].message.content
         except Exception as e:
-            self.logger.error(f"Final response generation failed: {e}", exc_info=True)
+            self.logger.error("Final response generation failed: %s", e, exc_info=True)
             return f"The workflow finished, but an error occurred during final response generation: {e}"
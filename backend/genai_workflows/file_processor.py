@@ -1,21 +1,90 @@
+import asyncio
 import os
 import shutil
 import logging
 import io
-from typing import List
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List
 
 from fastapi import UploadFile
 
-# Import necessary libraries for text extraction, handling potential import errors
+from ..config import settings
+
+# Text extraction libraries are optional and imported independently, so a missing OCR
+# stack does not also disable PDF or DOCX ingestion.
+try:
+    import fitz  # PyMuPDF: C-based and much faster than PyPDF2, which stays as the fallback
+except ImportError:
+    fitz = None
 try:
     import PyPDF2
+except ImportError:
+    PyPDF2 = None
+try:
     from PIL import Image
     import pytesseract
+except ImportError:
+    Image = pytesseract = None
+try:
     import docx
-    EXTRACTION_LIBS_AVAILABLE = True
 except ImportError:
-    EXTRACTION_LIBS_AVAILABLE = False
-    logging.warning("Optional libraries for file text extraction (PyPDF2, Pillow, pytesseract, python-docx) are not installed. File Ingestion will be limited.")
+    docx = None
+
+if not ((fitz or PyPDF2) and pytesseract and docx):
+    logging.warning("Optional libraries for file text extraction (PyPDF2, Pillow, pytesseract, python-docx) are not all installed. File Ingestion will be limited.")
+
+
+_WORKER_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.bmp', '.tiff'})
+
+
+def _extract_pdf(file_content: bytes) -> str:
+    if fitz is not None:
+        with fitz.open(stream=file_content, filetype="pdf") as doc:
+            return "\n".join(page.get_text() for page in doc)
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+    return "".join(page.extract_text() for page in pdf_reader.pages)
+
+
+def _extract_image(file_content: bytes) -> str:
+    return pytesseract.image_to_string(Image.open(io.BytesIO(file_content)), config=settings.TESSERACT_CONFIG)
+
+
+def _extract_docx(file_content: bytes) -> str:
+    doc = docx.Document(io.BytesIO(file_content))
+    return "\n".join([p.text for p in doc.paragraphs])
+
+
+def _extract_txt(file_content: bytes) -> str:
+    return file_content.decode('utf-8')
+
+
+# File extension -> extractor. Only the extension string crosses into the worker process.
+_EXT_HANDLERS: Dict[str, Callable[[bytes], str]] = {
+    '.pdf': _extract_pdf,
+    '.docx': _extract_docx,
+    '.txt': _extract_txt,
+    **{extension: _extract_image for extension in IMAGE_EXTENSIONS},
+}
+
+# File extension -> library that must be installed before it can be extracted, for the ones that are missing.
+_MISSING_LIBRARIES: Dict[str, str] = {}
+if fitz is None and PyPDF2 is None:
+    _MISSING_LIBRARIES['.pdf'] = "PyMuPDF or PyPDF2"
+if pytesseract is None:
+    _MISSING_LIBRARIES.update(dict.fromkeys(IMAGE_EXTENSIONS, "Pillow and pytesseract"))
+if docx is None:
+    _MISSING_LIBRARIES['.docx'] = "python-docx"
+
+
+def _extract_text(file_content: bytes, file_extension: str) -> str:
+    """
+    Extracts the text of a single file. Runs in a worker process, so it must stay a
+    module-level function (picklable) and must not touch the FileProcessor instance.
+    """
+    return _EXT_HANDLERS[file_extension](file_content)
 
 
 class FileProcessor:
@@ -26,42 +95,50 @@ class FileProcessor:
 
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        # PDF parsing and OCR are CPU-bound and hold the GIL, so they run in worker processes
+        # instead of on the event loop. Workers are only started on the first submitted file.
+        # They are started from a clean forkserver (spawn where that is unavailable) rather than
+        # forked: the server is multithreaded by then, and forking it can deadlock the workers and
+        # would copy its memory (cached FAISS indexes included) into each of them.
+        self._cpu_pool = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context(_WORKER_START_METHOD))
+
+    def close(self):
+        """Shuts down the extraction worker processes."""
+        self._cpu_pool.shutdown(cancel_futures=True)
 
     async def extract_text_from_files(self, files: List[UploadFile]) -> List[str]:
         """
         Extracts text content from a list of uploaded files.
         Supports PDF, common image formats, DOCX, and TXT.
         """
-        if not EXTRACTION_LIBS_AVAILABLE:
-            raise ImportError("Cannot extract text because required libraries are missing.")
+        contents = await asyncio.gather(*(file.read() for file in files))
+        extensions = [os.path.splitext(file.filename)[1].lower() for file in files]
+
+        # Every supported file is extracted concurrently across the worker processes.
+        loop = asyncio.get_running_loop()
+        pending = {
+            i: loop.run_in_executor(self._cpu_pool, _extract_text, contents[i], extension)
+            for i, extension in enumerate(extensions)
+            if extension in _EXT_HANDLERS and extension not in _MISSING_LIBRARIES
+        }
+        results = dict(zip(pending, await asyncio.gather(*pending.values(), return_exceptions=True)))
 
         extracted_content = []
-        for file in files:
-            file_content = await file.read()
-            file_extension = os.path.splitext(file.filename)[1].lower()
-            text = ""
-
-            try:
-                if file_extension == '.pdf':
-                    pdf_file = io.BytesIO(file_content)
-                    pdf_reader = PyPDF2.PdfReader(pdf_file)
-                    text = "".join(page.extract_text() for page in pdf_reader.pages)
-                elif file_extension in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']:
-                    image = Image.open(io.BytesIO(file_content))
-                    text = pytesseract.image_to_string(image)
-                elif file_extension == '.docx':
-                    doc = docx.Document(io.BytesIO(file_content))
-                    text = "\n".join([p.text for p in doc.paragraphs])
-                elif file_extension == '.txt':
-                    text = file_content.decode('utf-8')
-                else:
-                    text = f"[Unsupported file type: {file_extension}]"
-                    self.logger.warning(f"Unsupported file type '{file_extension}' for text extraction from file '{file.filename}'.")
-            except Exception as e:
+        for i, file in enumerate(files):
+            if extensions[i] in _MISSING_LIBRARIES:
+                library = _MISSING_LIBRARIES[extensions[i]]
+                text = f"[Cannot extract text from {file.filename}: {library} is not installed]"
+                self.logger.error(f"Cannot extract text from '{file.filename}' because {library} is not installed.")
+            elif i not in results:
+                text = f"[Unsupported file type: {extensions[i]}]"
+                self.logger.warning(f"Unsupported file type '{extensions[i]}' for text extraction from file '{file.filename}'.")
+            elif isinstance(results[i], Exception):
+                e = results[i]
                 error_msg = f"Failed to extract text from {file.filename}: {e}"
-                self.logger.error(error_msg, exc_info=True)
+                self.logger.error(error_msg, exc_info=e)
                 text = f"[Error processing file: {file.filename}]"
-
+            else:
+                text = results[i]
             extracted_content.append(text)
 
         self.logger.info(f"Extracted text from {len(extracted_content)} file(s).")
@@ -78,12 +155,17 @@ class FileProcessor:
         target_dir = os.path.join(base_storage_dir, custom_path, execution_id)
         os.makedirs(target_dir, exist_ok=True)
 
-        saved_file_paths = []
-        for file in files:
+        async def save_one(file: UploadFile) -> str:
             file_location = os.path.join(target_dir, file.filename)
-            with open(file_location, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            saved_file_paths.append(file_location)
+            # The copy is blocking disk I/O, so it runs on a worker thread to keep the event loop free.
+            await asyncio.to_thread(self._copy_to_disk, file, file_location)
             self.logger.info(f"Successfully saved file to: {file_location}")
+            return file_location
+
+        return list(await asyncio.gather(*(save_one(file) for file in files)))
 
-        return saved_file_paths
\ No newline at end of file
+    @staticmethod
+    def _copy_to_disk(file: UploadFile, file_location: str):
+        """Streams an upload's spooled contents into a file on disk."""
+        with open(file_location, "wb") as buffer:
+            shutil.copyfileobj(file.file, buffer, 1 << 20)
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple
+
+import numpy as np
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(Protocol):
+    """Storage for cached completions. Implementations must be safe to call from any thread."""
+
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    def set(self, key: str, value: str) -> None:
+        ...
+
+
+class MemoryCacheBackend:
+    """A process-local, least-recently-used cache holding at most max_entries completions."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class LLMCache:
+    """
+    Caches the text of deterministic chat completions. Only temperature=0 calls are cached: a
+    sampled completion is expected to differ between calls, so replaying one would change behavior.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        self.backend = backend if backend is not None else MemoryCacheBackend(settings.LLM_CACHE_SIZE)
+
+    @staticmethod
+    def key(model: str, messages: List[Dict[str, Any]], temperature: float, **kwargs) -> str:
+        """A content hash of everything that determines the completion."""
+        payload = {"model": model, "messages": messages, "temperature": temperature, **kwargs}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    @staticmethod
+    def _message_content(response) -> Optional[str]:
+        return response.choices[0].message.content
+
+    async def complete(
+            self, client, model: str, messages: List[Dict[str, Any]], temperature: float,
+            extract: Callable[[Any], Optional[str]] = _message_content, **kwargs
+    ) -> Optional[str]:
+        """
+        Returns extract(client.chat.completions.create(...)), by default the message content, from
+        the cache when this exact deterministic request has been answered before.
+        """
+        if temperature != 0 or settings.LLM_CACHE_SIZE <= 0:
+            response = await client.chat.completions.create(model=model, messages=messages, temperature=temperature, **kwargs)
+            return extract(response)
+
+        key = self.key(model, messages, temperature, **kwargs)
+        content = self.backend.get(key)
+        if content is not None:
+            logger.info("LLM cache hit for model '%s'.", model)
+            return content
+
+        response = await client.chat.completions.create(model=model, messages=messages, temperature=temperature, **kwargs)
+        content = extract(response)
+        if content is not None:
+            self.backend.set(key, content)
+        return content
+
+
+class ToolCallCache:
+    """
+    Remembers which tool (and arguments) the agent chose for a prompt, so a later prompt whose
+    embedding is nearly identical, offered the same tools, can reuse that choice instead of
+    asking the model again. Entries are kept per tool set, newest last, at most max_entries each.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        # Sorted tool names -> (unit-length prompt embeddings as rows, [(tool_name, tool_args), ...])
+        self._entries: Dict[Tuple[str, ...], Tuple[np.ndarray, List[Tuple[str, Dict[str, Any]]]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _unit(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, tool_names: Tuple[str, ...], embedding: List[float], min_similarity: float) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Returns the (tool_name, tool_args) of the most similar stored prompt, if its cosine similarity reaches min_similarity."""
+        with self._lock:
+            entry = self._entries.get(tool_names)
+            if entry is None:
+                return None
+            vectors, calls = entry
+            similarities = vectors @ self._unit(embedding)
+            best = int(np.argmax(similarities))
+            if similarities[best] < min_similarity:
+                return None
+            tool_name, tool_args = calls[best]
+            return tool_name, dict(tool_args)
+
+    def add(self, tool_names: Tuple[str, ...], embedding: List[float], tool_name: str, tool_args: Dict[str, Any]):
+        vector = self._unit(embedding)[np.newaxis, :]
+        with self._lock:
+            vectors, calls = self._entries.get(tool_names, (np.empty((0, vector.shape[1]), dtype=np.float32), []))
+            vectors = np.vstack([vectors, vector])[-self.max_entries:]
+            calls = (calls + [(tool_name, dict(tool_args))])[-self.max_entries:]
+            self._entries[tool_names] = (vectors, calls)
@@ -1,25 +1,176 @@
+import asyncio
+import itertools
 import logging
-from typing import List, Optional
-from .workflow import Workflow
+import numpy as np
+from typing import Dict, List, Optional
+from .workflow import WorkflowSummary
 from ..config import settings
 
+# Catalogs larger than this are split into shards that are matched concurrently; the shard
+# winners then compete in a final round. Keeps each routing prompt short as workflows grow.
+ROUTER_SHARD_SIZE = 40
+ROUTER_MAX_CONCURRENCY = 8  # Routing LLM calls allowed in flight at once
+
+# Semantic route cache: a query whose embedding is at least this similar (cosine) to an earlier
+# routed query reuses that query's workflow instead of asking the LLM again.
+ROUTE_CACHE_SIZE = 256
+ROUTE_CACHE_SIMILARITY = 0.92
+ROUTE_EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Catalogs larger than a shard are first narrowed to the workflows whose embedded name,
+# description and triggers are closest to the query; only those candidates reach the LLM.
+ROUTER_PREFILTER_CANDIDATES = 10
+ROUTER_EMBEDDING_BATCH_SIZE = 512  # Workflow descriptions embedded per API request
+
 class WorkflowRouter:
     """Selects the best workflow to handle a user query."""
 
     def __init__(self, openai_client):
         self.client = openai_client
         self.logger = logging.getLogger(__name__)
+        self._llm_semaphore = asyncio.Semaphore(ROUTER_MAX_CONCURRENCY)
 
-    def find_matching_workflow(self, query: str, workflows: List[Workflow]) -> Optional[Workflow]:
-        """
-        Finds the best matching workflow from a list using an LLM.
+        # Route cache rows: normalized query embeddings, the workflow each was routed to, and a
+        # last-used tick for LRU eviction. Cleared whenever the workflow catalog changes.
+        self._route_vectors: Optional[np.ndarray] = None
+        self._route_workflow_ids: List[int] = []
+        self._route_last_used: List[int] = []
+        self._route_catalog_key: Optional[int] = None
+        # Normalized embedding of each workflow's routing text, keyed by that text so an edited
+        # workflow is re-embedded. Pruned to the current catalog whenever it changes.
+        self._workflow_vectors: Dict[str, np.ndarray] = {}
+        # Normalized trigger phrase -> workflow id. A query that is exactly a trigger skips routing.
+        self._trigger_index: Dict[str, int] = {}
+        self._ticks = itertools.count()
 
-        Note: This approach can be slow with many workflows. For production,
-        consider replacing this with a vector embedding search for better performance.
+    async def find_matching_workflow(self, query: str, workflows: List[WorkflowSummary]) -> Optional[WorkflowSummary]:
+        """
+        Finds the best matching workflow from a list. Queries close to an earlier routed query
+        are answered from the semantic route cache; otherwise an LLM picks the workflow.
         """
         if not workflows:
             return None
 
+        catalog_key = hash(tuple((wf.id, wf.name, wf.description, tuple(wf.triggers)) for wf in workflows))
+        if catalog_key != self._route_catalog_key:
+            self._route_vectors, self._route_workflow_ids, self._route_last_used = None, [], []
+            self._route_catalog_key = catalog_key
+            self._trigger_index = {}
+            routing_texts = {self._routing_text(wf) for wf in workflows}
+            self._workflow_vectors = {t: v for t, v in self._workflow_vectors.items() if t in routing_texts}
+            for wf in workflows:
+                for trigger in wf.triggers:
+                    self._trigger_index.setdefault(self._normalize_trigger(trigger), wf.id)
+
+        trigger_match = self._trigger_index.get(self._normalize_trigger(query))
+        if trigger_match is not None:
+            workflow = next(wf for wf in workflows if wf.id == trigger_match)
+            self.logger.info("Query is a trigger phrase of workflow '%s'; skipping routing.", workflow.name)
+            return workflow
+
+        embedding = await self._embed_query(query)
+        if embedding is not None:
+            cached = self._lookup_route(embedding, workflows)
+            if cached:
+                self.logger.info("Route cache hit: matched query to workflow '%s'", cached.name)
+                return cached
+
+        candidates = workflows
+        if embedding is not None and len(workflows) > ROUTER_SHARD_SIZE:
+            candidates = await self._prefilter(embedding, workflows) or workflows
+
+        workflow = await self._route(query, candidates)
+        if workflow and embedding is not None:
+            self._remember_route(embedding, workflow.id)
+        return workflow
+
+    @staticmethod
+    def _normalize_trigger(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    async def _route(self, query: str, workflows: List[WorkflowSummary]) -> Optional[WorkflowSummary]:
+        """
+        Picks a workflow with the LLM. Small catalogs are matched with a single prompt; larger
+        ones are matched shard by shard in parallel, and the shard winners are then matched
+        against each other.
+        """
+        if len(workflows) <= ROUTER_SHARD_SIZE:
+            return await self._match(query, workflows)
+
+        shards = [workflows[i:i + ROUTER_SHARD_SIZE] for i in range(0, len(workflows), ROUTER_SHARD_SIZE)]
+        winners = [wf for wf in await asyncio.gather(*(self._match(query, shard) for shard in shards)) if wf]
+        if len(winners) <= 1:
+            return winners[0] if winners else None
+        return await self._route(query, winners)
+
+    async def _embed_query(self, query: str) -> Optional[np.ndarray]:
+        """Returns the query's L2-normalized embedding, or None if it could not be computed."""
+        try:
+            response = await self.client.embeddings.create(input=[query], model=ROUTE_EMBEDDING_MODEL)
+        except Exception as e:
+            self.logger.warning("Could not embed query for the route cache; routing without it: %s", e)
+            return None
+        embedding = np.asarray(response.data[0].embedding, dtype=np.float32)
+        return embedding / (np.linalg.norm(embedding) or 1.0)
+
+    @staticmethod
+    def _routing_text(workflow: WorkflowSummary) -> str:
+        return f"{workflow.name}\n{workflow.description}\n{'; '.join(workflow.triggers)}"
+
+    async def _prefilter(self, embedding: np.ndarray, workflows: List[WorkflowSummary]) -> Optional[List[WorkflowSummary]]:
+        """
+        Returns the workflows most similar to the query embedding, best first, embedding any
+        workflow not seen before. Returns None if the workflow embeddings could not be computed.
+        """
+        texts = [self._routing_text(wf) for wf in workflows]
+        missing = list(dict.fromkeys(t for t in texts if t not in self._workflow_vectors))
+        try:
+            for i in range(0, len(missing), ROUTER_EMBEDDING_BATCH_SIZE):
+                batch = missing[i:i + ROUTER_EMBEDDING_BATCH_SIZE]
+                response = await self.client.embeddings.create(input=batch, model=ROUTE_EMBEDDING_MODEL)
+                vectors = np.asarray([item.embedding for item in response.data], dtype=np.float32)
+                vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+                self._workflow_vectors.update(zip(batch, vectors))
+        except Exception as e:
+            self.logger.warning("Could not embed workflows for prefiltering; routing over the full catalog: %s", e)
+            return None
+
+        scores = np.stack([self._workflow_vectors[t] for t in texts]) @ embedding
+        k = min(ROUTER_PREFILTER_CANDIDATES, len(workflows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [workflows[i] for i in top[np.argsort(-scores[top])]]
+
+    def _lookup_route(self, embedding: np.ndarray, workflows: List[WorkflowSummary]) -> Optional[WorkflowSummary]:
+        """Returns the cached workflow for the most similar earlier query, if it is similar enough."""
+        if not self._route_workflow_ids:
+            return None
+        # One matrix-vector product scores every cached query at once.
+        similarities = self._route_vectors[:len(self._route_workflow_ids)] @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < ROUTE_CACHE_SIMILARITY:
+            return None
+        workflow_id = self._route_workflow_ids[best]
+        workflow = next((wf for wf in workflows if wf.id == workflow_id), None)
+        if workflow:
+            self._route_last_used[best] = next(self._ticks)
+        return workflow
+
+    def _remember_route(self, embedding: np.ndarray, workflow_id: int):
+        """Caches a routing decision, evicting the least recently used entry when full."""
+        if self._route_vectors is None:
+            self._route_vectors = np.empty((ROUTE_CACHE_SIZE, len(embedding)), dtype=np.float32)
+        if len(self._route_workflow_ids) < ROUTE_CACHE_SIZE:
+            row = len(self._route_workflow_ids)
+            self._route_workflow_ids.append(workflow_id)
+            self._route_last_used.append(next(self._ticks))
+        else:
+            row = int(np.argmin(self._route_last_used))
+            self._route_workflow_ids[row] = workflow_id
+            self._route_last_used[row] = next(self._ticks)
+        self._route_vectors[row] = embedding
+
+    async def _match(self, query: str, workflows: List[WorkflowSummary]) -> Optional[WorkflowSummary]:
+        """Asks the LLM which of the given workflows best handles the query."""
         workflow_summaries = "\n".join(
             [f"ID: {wf.name} - Triggers: {', '.join(wf.triggers)} - Description: {wf.description}" for wf in workflows]
         )
@@ -39,26 +190,27 @@ class WorkflowRouter:
 
         try:
             # Use the global settings object for the default model
-            response = self.client.chat.completions.create(
-                model=settings.DEFAULT_MODEL,
-                messages=[{"role": "user", "content": match_prompt}],
-                temperature=0.0,
-                max_tokens=50
-            )
+            async with self._llm_semaphore:
+                response = await self.client.chat.completions.create(
+                    model=settings.DEFAULT_MODEL,
+                    messages=[{"role": "user", "content": match_prompt}],
+                    temperature=0.0,
+                    max_tokens=50
+                )
 
             best_match_name = response.choices[0].message.content.strip()
 
             if best_match_name == "NONE":
-                self.logger.info(f"No matching workflow found for query: '{query}'")
+                self.logger.info("No matching workflow found for query: '%s'", query)
                 return None
 
             for workflow in workflows:
                 if workflow.name == best_match_name:
-                    self.logger.info(f"Matched query to workflow: '{workflow.name}'")
+                    self.logger.info("Matched query to workflow: '%s'", workflow.name)
                     return workflow
 
             return None
 
         except Exception as e:
-            self.logger.error(f"Error during workflow matching: {e}")
+            self.logger.error("Error during workflow matching: %s", e)
             return None
\ No newline at end of file
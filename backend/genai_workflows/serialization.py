@@ -0,0 +1,39 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Execution states and prompt values can carry large extracted documents, so they go through orjson
+# when it is installed. Non-string keys and numpy values are accepted; other types go through json_default.
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+
+def json_default(value: Any) -> Any:
+    """
+    Converts values JSON has no type for, used as the `default` hook of json/orjson dumps.
+    Structured values keep their structure (so an LLM reading the JSON still sees fields)
+    instead of collapsing into their str().
+    """
+    if hasattr(value, "model_dump"):  # Pydantic models
+        return value.model_dump()
+    if hasattr(value, "isoformat"):  # datetime, date and time (orjson handles these natively, json does not)
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return str(value)
+
+
+def _dumps(value: Any, indent: bool = False) -> str:
+    """Serializes a value like json.dumps(value, default=json_default) (indented by 2 if asked)."""
+    if orjson is not None:
+        return orjson.dumps(value, default=json_default, option=_ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)).decode()
+    return json.dumps(value, indent=2 if indent else None, default=json_default)
+
+
+def _loads(text: Union[str, bytes]) -> Any:
+    return orjson.loads(text) if orjson is not None else json.loads(text)
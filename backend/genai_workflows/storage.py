@@ -1,19 +1,74 @@
 import sqlite3
 import json
+import threading
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from .workflow import Workflow
+from .workflow import Workflow, WorkflowSummary
+from .serialization import _dumps, _loads
+
 
 class WorkflowStorage:
     """Manages persistent storage for workflows and their execution states using SQLite."""
 
     def __init__(self, db_path: str):
         self.db_path = db_path
+        # Deserialized workflows are cached in-process. All writes go through save_workflow and
+        # delete_workflow, which invalidate the cache. Cached objects are shared; treat them as read-only.
+        self._workflow_cache: Dict[int, Workflow] = {}
+        self._all_workflows_cache: Optional[List[Workflow]] = None
+        self._summaries_cache: Optional[List[WorkflowSummary]] = None
+        # One connection per thread, opened on first use and reused for every later call. sqlite3
+        # connections may not be shared across threads, and FastAPI runs sync endpoints in a pool.
+        # Every connection is also registered so close() can reach the ones owned by other threads;
+        # bumping the generation makes those threads open a fresh connection on their next call.
+        self._local = threading.local()
+        self._open_connections: List[sqlite3.Connection] = []
+        self._generation = 0
+        self._connections_lock = threading.Lock()
         self._init_database()
 
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Returns this thread's connection, opening it with the performance settings applied on first use.
+        Callers use it as 'with self._connect() as conn:', which commits or rolls back but keeps it open.
+        """
+        cached = getattr(self._local, "conn", None)
+        if cached is not None and cached[0] == self._generation:
+            return cached[1]
+        generation = self._generation
+        # check_same_thread=False only so close() can close it from another thread; each connection
+        # is still used solely by the thread that opened it.
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        # WAL (set once in _init_database) only needs an fsync at checkpoints, so NORMAL is still
+        # crash-safe; the remaining settings keep hot pages and temp tables in memory.
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MB
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        self._local.conn = (generation, conn)
+        with self._connections_lock:
+            self._open_connections.append(conn)
+        return conn
+
+    def close(self):
+        """
+        Closes every thread's connection to the database, e.g. on shutdown. Threads that use the
+        storage afterwards open new connections.
+        """
+        with self._connections_lock:
+            self._generation += 1
+            connections, self._open_connections = self._open_connections, []
+        for conn in connections:
+            conn.close()
+
     def _init_database(self):
         """Initializes the database schema, creating tables for workflows and execution states."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
+            # WAL lets readers proceed while a writer commits, so concurrent executions don't
+            # serialize on the database lock. The mode is persistent, so it is set once here.
+            conn.execute("PRAGMA journal_mode=WAL")
             cursor = conn.cursor()
             # Table for storing workflow definitions
             cursor.execute("""
@@ -45,12 +100,23 @@ class WorkflowStorage:
                                )
                            """)
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_execution_states_status ON execution_states(status)")
+
+            # Step history of paused executions, one row per entry. Entries are only ever appended,
+            # so a pause writes its new entries instead of re-serializing the whole history.
+            cursor.execute("""
+                           CREATE TABLE IF NOT EXISTS execution_history (
+                                                                            execution_id TEXT NOT NULL,
+                                                                            seq INTEGER NOT NULL,          -- Position in step_history
+                                                                            entry TEXT NOT NULL,           -- One history entry as JSON
+                                                                            PRIMARY KEY (execution_id, seq)
+                               ) WITHOUT ROWID
+                           """)
             conn.commit()
 
     def save_workflow(self, workflow: Workflow) -> int:
         """Saves a new workflow or updates an existing one based on its name.
         Returns the workflow's database ID."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             now = datetime.now().isoformat()
             steps_json = json.dumps({step_id: step.to_dict() for step_id, step in workflow.steps.items()})
@@ -77,30 +143,55 @@ class WorkflowStorage:
             cursor.execute("SELECT id FROM workflows WHERE name = ?", (workflow.name,))
             workflow_id = cursor.fetchone()[0]
             conn.commit()
-            return workflow_id
+        self._invalidate_workflow_cache(workflow_id)
+        return workflow_id
 
     def get_workflow(self, workflow_id: int) -> Optional[Workflow]:
         """Retrieves a single workflow by its primary key ID."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        cached = self._workflow_cache.get(workflow_id)
+        if cached is not None:
+            return cached
+
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM workflows WHERE id = ?", (workflow_id,))
             row = cursor.fetchone()
-            return self._row_to_workflow(row)
+            workflow = self._row_to_workflow(row)
+        if workflow is not None:
+            self._workflow_cache[workflow_id] = workflow
+        return workflow
 
     def get_all_workflows(self) -> List[Workflow]:
         """Retrieves all workflows from the database."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        if self._all_workflows_cache is not None:
+            return list(self._all_workflows_cache)
+
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM workflows ORDER BY name ASC")
             rows = cursor.fetchall()
-            return [self._row_to_workflow(row) for row in rows]
+            workflows = [self._row_to_workflow(row) for row in rows]
+        self._all_workflows_cache = workflows
+        self._workflow_cache.update((workflow.id, workflow) for workflow in workflows)
+        return list(workflows)
+
+    def list_workflow_summaries(self) -> List[WorkflowSummary]:
+        """
+        Returns the routing fields of every workflow. Unlike get_all_workflows, this never reads
+        or deserializes step definitions, so routing cost does not grow with workflow size.
+        """
+        if self._summaries_cache is None:
+            with self._connect() as conn:
+                rows = conn.execute("SELECT id, name, description, triggers FROM workflows ORDER BY name ASC").fetchall()
+            self._summaries_cache = [
+                WorkflowSummary(row["id"], row["name"], row["description"] or "", _loads(row["triggers"]) if row["triggers"] else [])
+                for row in rows
+            ]
+        return list(self._summaries_cache)
 
     def list_workflows(self) -> List[Dict[str, Any]]:
         """Provides a lightweight list of workflows with basic information."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT id, name, description, owner, created_at FROM workflows ORDER BY name ASC")
             rows = cursor.fetchall()
@@ -108,11 +199,19 @@ class WorkflowStorage:
 
     def delete_workflow(self, workflow_id: int) -> bool:
         """Deletes a workflow by ID. Cascading delete removes associated execution states."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM workflows WHERE id = ?", (workflow_id,))
             conn.commit()
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        self._invalidate_workflow_cache(workflow_id)
+        return deleted
+
+    def _invalidate_workflow_cache(self, workflow_id: int):
+        """Drops a changed workflow and the cached full list so the next read goes to the database."""
+        self._workflow_cache.pop(workflow_id, None)
+        self._all_workflows_cache = None
+        self._summaries_cache = None
 
     def _row_to_workflow(self, row: sqlite3.Row) -> Optional[Workflow]:
         """Converts a database row into a fully-formed Workflow object."""
@@ -122,17 +221,17 @@ class WorkflowStorage:
         workflow_data = dict(row)
 
         # This ensures that what we pass to Workflow.from_dict is correctly typed.
-        workflow_data["triggers"] = json.loads(workflow_data["triggers"]) if workflow_data.get("triggers") else []
-        workflow_data["steps"] = json.loads(workflow_data["steps"]) if workflow_data.get("steps") else {}
+        workflow_data["triggers"] = _loads(workflow_data["triggers"]) if workflow_data.get("triggers") else []
+        workflow_data["steps"] = _loads(workflow_data["steps"]) if workflow_data.get("steps") else {}
 
         return Workflow.from_dict(workflow_data)
 
     def save_execution_state(self, execution_id: str, workflow_id: int, status: str, state_dict: Dict[str, Any]):
         """Saves or updates the state of a running/paused workflow execution."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             now = datetime.now().isoformat()
-            state_json = json.dumps(state_dict, default=str)
+            state_json = _dumps(state_dict)
 
             cursor.execute("""
                            INSERT INTO execution_states (execution_id, workflow_id, status, state_json, created_at, updated_at)
@@ -144,18 +243,69 @@ class WorkflowStorage:
                            """, (execution_id, workflow_id, status, state_json, now, now))
             conn.commit()
 
+    def save_paused_execution(self, execution_id: str, workflow_id: int, state_dict: Dict[str, Any], pause_entry: Dict[str, Any]):
+        """
+        Records a pause in one write transaction. The state is stored without its step history;
+        history entries not yet in execution_history (including the pause entry) are appended
+        there. BEGIN IMMEDIATE takes the write lock up front, so a concurrent writer waits on
+        busy_timeout instead of failing midway through.
+        """
+        history = state_dict["step_history"]
+        history.append(pause_entry)
+        state_json = _dumps({k: v for k, v in state_dict.items() if k != "step_history"})
+        now = datetime.now().isoformat()
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("""
+                         INSERT INTO execution_states (execution_id, workflow_id, status, state_json, created_at, updated_at)
+                         VALUES (?, ?, 'paused', ?, ?, ?)
+                             ON CONFLICT(execution_id) DO UPDATE SET
+                             status=excluded.status,
+                                                              state_json=excluded.state_json,
+                                                              updated_at=excluded.updated_at
+                         """, (execution_id, workflow_id, state_json, now, now))
+            # history[0] is entry number `offset` of the execution; entries the executor trimmed
+            # from the front are dropped here too. Everything past the last stored seq is new.
+            offset = state_dict.get("step_history_offset", 0)
+            conn.execute("DELETE FROM execution_history WHERE execution_id = ? AND seq < ?", (execution_id, offset))
+            next_seq = conn.execute("SELECT COALESCE(MAX(seq) + 1, 0) FROM execution_history WHERE execution_id = ?", (execution_id,)).fetchone()[0]
+            conn.executemany(
+                "INSERT INTO execution_history (execution_id, seq, entry) VALUES (?, ?, ?)",
+                ((execution_id, seq, _dumps(history[seq - offset])) for seq in range(max(next_seq, offset), offset + len(history)))
+            )
+
     def get_execution_state(self, execution_id: str) -> Optional[Dict[str, Any]]:
-        """Retrieves a paused execution state by its ID."""
-        with sqlite3.connect(self.db_path) as conn:
+        """Retrieves a paused execution state by its ID, with its step history rehydrated."""
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT state_json FROM execution_states WHERE execution_id = ? AND status = 'paused'", (execution_id,))
             row = cursor.fetchone()
-            return json.loads(row[0]) if row else None
+            if not row:
+                return None
+            state = _loads(row[0])
+            history = self._get_history(conn, execution_id)
+        # States saved before history moved to its own table still carry it inline.
+        if history or "step_history" not in state:
+            state["step_history"] = history
+        return state
+
+    def get_history(self, execution_id: str) -> List[Dict[str, Any]]:
+        """Returns the stored step history of an execution, oldest entry first."""
+        with self._connect() as conn:
+            return self._get_history(conn, execution_id)
+
+    @staticmethod
+    def _get_history(conn: sqlite3.Connection, execution_id: str) -> List[Dict[str, Any]]:
+        rows = conn.execute("SELECT entry FROM execution_history WHERE execution_id = ? ORDER BY seq", (execution_id,))
+        return [_loads(row[0]) for row in rows]
 
     def delete_execution_state(self, execution_id: str) -> bool:
-        """Deletes an execution state, typically after completion or failure."""
-        with sqlite3.connect(self.db_path) as conn:
+        """Deletes an execution state and its step history, typically after completion or failure."""
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM execution_states WHERE execution_id = ?", (execution_id,))
+            deleted = cursor.rowcount > 0
+            cursor.execute("DELETE FROM execution_history WHERE execution_id = ?", (execution_id,))
             conn.commit()
-            return cursor.rowcount > 0
\ No newline at end of file
+            return deleted
@@ -0,0 +1,71 @@
+import re
+from typing import List
+
+# Separator tiers, strongest first. A chunk is cut at the strongest tier found in the back half
+# of its window; sentence and clause separators keep their punctuation in the chunk.
+_SEPARATOR_TIERS = (("\n\n",), ("\n",), (". ", "! ", "? "), (", ",), (" ",))
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_LEADING_WHITESPACE_RE = re.compile(r"\s*")
+
+
+def _find_cut(text: str, start: int, end: int) -> int:
+    """Returns the position to cut at within text[start:end], or -1 if there is no separator."""
+    for separators in _SEPARATOR_TIERS:
+        # Keep punctuation ("." or ",") with the chunk it ends; drop pure whitespace.
+        keep = 0 if separators[0][0].isspace() else 1
+        best = -1
+        for separator in separators:
+            # The dropped part of the separator may spill past `end`.
+            index = text.rfind(separator, start, end - keep + len(separator))
+            if index > best:
+                best = index
+        if best != -1:
+            return best + keep
+    return -1
+
+
+def fast_split(text: str, chunk_size: int, chunk_overlap: int = 0) -> List[str]:
+    """
+    Splits text into chunks of at most `chunk_size` characters in a single forward pass.
+
+    Each chunk is filled greedily and then cut at the strongest separator (paragraph, line,
+    sentence, clause, word) in the back half of its window, so chunks stay at least half full.
+    Consecutive chunks share up to `chunk_overlap` characters, restarting on a word boundary.
+    Runs without any whitespace longer than a chunk are split hard.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer.")
+    chunk_overlap = max(0, min(chunk_overlap or 0, chunk_size - 1))
+
+    length = len(text)
+    position = _LEADING_WHITESPACE_RE.match(text).end()
+    chunks: List[str] = []
+
+    while position < length:
+        limit = position + chunk_size
+        if limit >= length:
+            chunk = text[position:].rstrip()
+            if chunk:
+                chunks.append(chunk)
+            break
+
+        cut = _find_cut(text, position + chunk_size // 2, limit)
+        if cut == -1:
+            cut = _find_cut(text, position + 1, limit)
+        if cut == -1:
+            cut = limit
+
+        chunk = text[position:cut].rstrip()
+        if chunk:
+            chunks.append(chunk)
+
+        next_position = _LEADING_WHITESPACE_RE.match(text, cut).end()
+        if chunk_overlap:
+            # Restart at the first word boundary within the last `chunk_overlap` characters.
+            boundary = _WHITESPACE_RE.search(text, max(cut - chunk_overlap, position + 1), cut)
+            if boundary and boundary.end() < cut:
+                next_position = boundary.end()
+        position = next_position
+
+    return chunks
@@ -1,13 +1,22 @@
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, field
 
+# Action types that cannot be a 'parallel_group' branch: they pause for input (human_input and the
+# file upload steps) or drive control flow of their own, which only the main executor loop can
+# handle. A FALSE condition_check reports success=False, which would fail the whole group, and an
+# intelligent_router's chosen route would be dropped.
+PARALLEL_GROUP_EXCLUDED_ACTIONS = frozenset({
+    "human_input", "file_ingestion", "file_storage", "start_loop", "end_loop", "parallel_group",
+    "condition_check", "intelligent_router",
+})
+
 
 @dataclass
 class WorkflowStep:
     """Represents a single, atomic step in a workflow."""
     step_id: str
     description: str
-    action_type: str  # 'agentic_tool_use', 'llm_response', 'condition_check', 'human_input', 'workflow_call', 'file_ingestion', 'vector_db_ingestion', 'vector_db_query', 'cross_encoder_rerank', 'file_storage', 'http_request', 'intelligent_router', 'direct_tool_call', 'display_message'
+    action_type: str  # 'agentic_tool_use', 'llm_response', 'condition_check', 'human_input', 'workflow_call', 'file_ingestion', 'vector_db_ingestion', 'vector_db_query', 'cross_encoder_rerank', 'file_storage', 'http_request', 'intelligent_router', 'direct_tool_call', 'display_message', 'parallel_group'
     prompt_template: Optional[str] = None
     on_success: str = 'END'
     on_failure: Optional[str] = None
@@ -31,6 +40,8 @@ class WorkflowStep:
     embedding_model: Optional[str] = None  # For ingestion
     chunk_size: Optional[int] = 1000  # For ingestion
     chunk_overlap: Optional[int] = 200  # For ingestion
+    splitter: Optional[str] = "recursive"  # For ingestion: "recursive" (LangChain) or "fast"
+    index_type: Optional[str] = "auto"  # For ingestion: "auto", "flat", "hnsw", "sq8" or "pq"
     top_k: Optional[int] = 5  # For query
     rerank_top_n: Optional[int] = 3  # For rerank
 
@@ -45,6 +56,8 @@ class WorkflowStep:
     url_template: Optional[str] = None
     headers_template: Optional[str] = None # JSON string
     body_template: Optional[str] = None # JSON string
+    include_response_headers: bool = False # Response headers are only copied into the output when requested
+    max_retries: Optional[int] = 2 # Retries on timeouts, connection errors and 5xx responses
 
     # --- Fields for 'intelligent_router' ---
     # Stores a mapping of route names to target step_ids. E.g., {"billing": "ask_billing_question", "technical": "create_tech_ticket"}
@@ -63,10 +76,14 @@ class WorkflowStep:
     input_collection_variable: Optional[str] = None
     current_item_output_key: Optional[str] = None
     loop_body_start_step_id: Optional[str] = None # This will be populated by from_graph
+    parallel_degree: Optional[int] = 1 # Iterations run concurrently when the loop body is side-effect free
 
     # --- Field for 'end_loop' ---
     value_to_return: Optional[str] = None
 
+    # --- Field for 'parallel_group' ---
+    branches: Optional[List[str]] = field(default_factory=list) # Step ids run concurrently; populated by from_graph
+
     def to_dict(self) -> Dict[str, Any]:
         # Exclude fields with default or None values for cleaner serialization, if desired.
         # For now, a simple conversion is robust.
@@ -79,6 +96,15 @@ class WorkflowStep:
         return cls(**data)
 
 
+@dataclass
+class WorkflowSummary:
+    """The fields of a workflow needed to route a query to it, without its steps."""
+    id: int
+    name: str
+    description: str = ""
+    triggers: List[str] = field(default_factory=list)
+
+
 @dataclass
 class Workflow:
     """Represents a complete, executable workflow."""
@@ -157,6 +183,9 @@ class Workflow:
                 elif source_handle == 'onFailure':
                     # The standard failure path
                     edges_by_source[source_id]['onFailure'] = edge.get("target")
+            elif source_node_type == 'parallel_group' and source_handle == 'branches':
+                # A parallel group fans out to every step connected to its 'branches' handle.
+                edges_by_source[source_id].setdefault('branches', []).append(edge.get("target"))
             else:
                 # Standard handle processing for all other nodes
                 edges_by_source[source_id][source_handle] = edge.get("target")
@@ -196,6 +225,11 @@ class Workflow:
                     target_node_id = connections.get(route_name, "END")
                     updated_routes[route_name] = target_node_id
                 step_data['routes'] = updated_routes
+            elif node_type == "parallel_group":
+                step_data["branches"] = connections.get("branches", [])
+                step_data["on_success"] = connections.get("default", "END")
+                if "onFailure" in connections:
+                    step_data["on_failure"] = connections.get("onFailure")
             elif node_type == "condition_check":
                 # Explicit handles for condition nodes
                 step_data["on_success"] = connections.get("onSuccess", "END")
@@ -222,10 +256,35 @@ class Workflow:
         if not start_step_id:
             raise ValueError("Workflow must have a connection from the START node.")
 
-        return cls(
+        workflow = cls(
             name=name,
             description=description,
             steps=backend_steps,
             start_step_id=start_step_id,
             raw_definition=raw_definition
         )
+        workflow.validate_parallel_groups()
+        return workflow
+
+    def validate_parallel_groups(self):
+        """
+        Checks that every 'parallel_group' can run its branches concurrently: each branch is a
+        single step that does not pause or loop, and no two branches write the same output_key.
+        Raises ValueError otherwise.
+        """
+        for step in self.steps.values():
+            if step.action_type != "parallel_group":
+                continue
+            if not step.branches:
+                raise ValueError(f"Parallel group '{step.step_id}' has no branches.")
+            output_keys = set()
+            for branch_id in step.branches:
+                branch = self.get_step(branch_id)
+                if not branch:
+                    raise ValueError(f"Parallel group '{step.step_id}' branch '{branch_id}' is not a step in this workflow.")
+                if branch.action_type in PARALLEL_GROUP_EXCLUDED_ACTIONS:
+                    raise ValueError(f"Parallel group '{step.step_id}' branch '{branch_id}' is a '{branch.action_type}' step, which cannot run in parallel.")
+                if branch.output_key:
+                    if branch.output_key in output_keys:
+                        raise ValueError(f"Parallel group '{step.step_id}' has more than one branch writing to output key '{branch.output_key}'.")
+                    output_keys.add(branch.output_key)
@@ -38,7 +38,7 @@ async def lifespan(app: FastAPI):
 
     # --- Shutdown Logic ---
     logging.info("Application shutting down...")
-    # Add any cleanup logic here if needed in the future
+    await app.state.engine.close()
 
 # --- FastAPI App Initialization ---
 app = FastAPI(
@@ -1,5 +1,6 @@
 import logging
-from typing import Callable, Dict, Any, List, Optional
+from functools import lru_cache
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 from .loader import ToolLoader
 
@@ -25,6 +26,9 @@ class ToolRegistry:
         self._loader = ToolLoader()
         self._tools: Dict[str, Callable] = {}
         self._tool_schemas: Dict[str, Dict[str, Any]] = {}
+        # Function schemas handed to the LLM, built once per scan instead of on every agentic step.
+        self._function_schemas: List[Dict[str, Any]] = []
+        self._schemas_for_names = lru_cache(maxsize=256)(self._build_schemas_for_names)
         self.rescan_tools() # Perform initial scan on startup
 
     def rescan_tools(self) -> int:
@@ -47,6 +51,8 @@ class ToolRegistry:
         for name, tool_data in loaded_tools.items():
             self._tools[name] = tool_data["callable"]
             self._tool_schemas[name] = tool_data["schema"]
+        self._function_schemas = [data['function'] for data in self._tool_schemas.values()]
+        self._schemas_for_names.cache_clear()
 
         count = len(self._tools)
         logger.info(f"Rescan complete. {count} tools are now registered.")
@@ -75,7 +81,7 @@ class ToolRegistry:
             A list of OpenAI-compatible tool schemas.
         """
         # Return a list of the function schemas
-        return [data['function'] for data in self._tool_schemas.values()]
+        return list(self._function_schemas)
 
     def get_tools_by_names(self, names: List[str]) -> List[Dict[str, Any]]:
         """
@@ -88,8 +94,14 @@ class ToolRegistry:
         Returns:
             A list of matching OpenAI-compatible tool schemas.
         """
-        # Filter the schemas and return the function part
-        return [
+        # The result only depends on the set of names, so it is memoized per sorted name tuple
+        # until the next rescan.
+        return list(self._schemas_for_names(tuple(sorted(set(names)))))
+
+    def _build_schemas_for_names(self, names: Tuple[str, ...]) -> Tuple[Dict[str, Any], ...]:
+        # Filter the schemas and return the function part, in registry order
+        wanted = frozenset(names)
+        return tuple(
             data['function'] for name, data in self._tool_schemas.items()
-            if name in names
-        ]
\ No newline at end of file
+            if name in wanted
+        )
\ No newline at end of file
@@ -19,6 +19,7 @@ const typeStyles = {
     direct_tool_call: {bg: 'bg-node-direct-tool-call', border: 'border-node-direct-tool-call', title: 'Direct Tool Call'},
     start_loop: {bg: 'bg-node-loop', border: 'border-node-loop', title: 'Start Loop'},
     display_message: { bg: 'bg-node-message', border: 'border-node-message', title: 'Display Message' },
+    parallel_group: {bg: 'bg-node-parallel', border: 'border-node-parallel', title: 'Parallel Group'},
     default: {bg: 'bg-gray-200', border: 'border-gray-400', title: 'Node'},
 };
 
@@ -28,7 +29,7 @@ const BaseNode = ({data, selected, children}) => {
     const selectionClass = selected ? 'shadow-lg ring-2 ring-indigo-500' : 'shadow-md';
     const displayTitle = data?.label || styles.title;
 
-    const customHandleNodes = ['condition_check', 'intelligent_router', 'start_loop'];
+    const customHandleNodes = ['condition_check', 'intelligent_router', 'start_loop', 'parallel_group'];
 
     // Truncate long prompts for display on the node
     const truncate = (text, length = 60) => {
@@ -80,6 +80,15 @@ export const HttpRequestNodeInspector = ({ nodeData, handleChange }) => {
                     <textarea id="body_template" name="body_template" rows={5} value={nodeData.body_template || ''} onChange={handleChange} placeholder={`{\n  "name": "{input.user_name}",\n  "value": 123\n}`} />
                 </div>
             )}
+            <div>
+                <label htmlFor="max_retries">Max Retries</label>
+                <input id="max_retries" name="max_retries" type="number" min="0" value={nodeData.max_retries ?? 2} onChange={handleChange} />
+                <p className="text-xs text-gray-400 mt-1">Retries timeouts, connection errors and 5xx responses with backoff.</p>
+            </div>
+            <div className="flex items-center gap-2">
+                <input id="include_response_headers" name="include_response_headers" type="checkbox" checked={nodeData.include_response_headers || false} onChange={handleChange} className="h-4 w-4 rounded border-gray-300 text-indigo-600 focus:ring-indigo-500" />
+                <label htmlFor="include_response_headers">Include response headers in output</label>
+            </div>
         </div>
     );
 };
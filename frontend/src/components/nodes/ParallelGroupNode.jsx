@@ -0,0 +1,58 @@
+import React from 'react';
+import BaseNode from './BaseNode';
+import { Handle, Position } from 'reactflow';
+import { Squares2X2Icon } from '@heroicons/react/24/outline';
+
+const ParallelGroupNode = ({ data, selected }) => {
+    return (
+        <BaseNode data={data} selected={selected}>
+            <div className="space-y-2">
+                <div className="flex items-center gap-1 text-xs text-gray-500">
+                    <Squares2X2Icon className="h-4 w-4 text-violet-600" />
+                    <span className="font-semibold">Run branches in parallel</span>
+                </div>
+                <p className="text-xs text-gray-400">
+                    Each step connected to Branches runs once, at the same time. Execution then continues from Next.
+                </p>
+                {data.output_key && (
+                    <div className="text-xs text-gray-500 pt-1 border-t border-gray-200">
+                        <span className="font-semibold">Branch Outputs To:</span>
+                        <span className="font-mono bg-green-100 text-green-800 px-1 rounded ml-1">
+                            {data.output_key}
+                        </span>
+                    </div>
+                )}
+                <div className="flex justify-between mt-2 px-1 text-xs font-bold text-center">
+                    <span className="text-violet-600">Branches</span>
+                    <span className="text-gray-600">Next</span>
+                    <span className="text-red-600">On Failure</span>
+                </div>
+            </div>
+
+            {/* Every edge from 'branches' is one parallel branch; 'default' is the path once all finish */}
+            <Handle
+                type="source"
+                position={Position.Bottom}
+                id="branches"
+                style={{ left: '25%' }}
+                className="!w-4 !h-4 !bg-violet-500"
+            />
+            <Handle
+                type="source"
+                position={Position.Bottom}
+                id="default"
+                style={{ left: '50%' }}
+                className="!w-4 !h-4 !bg-gray-500"
+            />
+            <Handle
+                type="source"
+                position={Position.Bottom}
+                id="onFailure"
+                style={{ left: '75%' }}
+                className="!w-4 !h-4 !bg-red-500"
+            />
+        </BaseNode>
+    );
+};
+
+export default ParallelGroupNode;
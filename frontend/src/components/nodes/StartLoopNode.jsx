@@ -102,6 +102,11 @@ export const StartLoopNodeInspector = ({ nodeData, handleChange }) => {
                 />
                 <p className="text-xs text-gray-400 mt-1">The name for the variable holding the item in each iteration.</p>
             </div>
+            <div>
+                <label htmlFor="parallel_degree">Parallel Iterations</label>
+                <input id="parallel_degree" name="parallel_degree" type="number" min="1" value={nodeData.parallel_degree ?? 1} onChange={handleChange} />
+                <p className="text-xs text-gray-400 mt-1">Iterations to run at once. Only applies when the loop body has no side effects (no input, file, save or tool nodes, and only GET requests).</p>
+            </div>
         </div>
     );
 };
@@ -62,6 +62,23 @@ export const VectorDBIngestionNodeInspector = ({ nodeData, handleChange }) => {
                 <label htmlFor="chunk_overlap">Chunk Overlap</label>
                 <input id="chunk_overlap" name="chunk_overlap" type="number" min="0" value={nodeData.chunk_overlap ?? 200} onChange={handleChange} />
             </div>
+            <div>
+                <label htmlFor="splitter">Text Splitter</label>
+                <select id="splitter" name="splitter" value={nodeData.splitter || 'recursive'} onChange={handleChange}>
+                    <option value="recursive">Recursive (LangChain)</option>
+                    <option value="fast">Fast (single regex pass)</option>
+                </select>
+            </div>
+            <div>
+                <label htmlFor="index_type">Index Type</label>
+                <select id="index_type" name="index_type" value={nodeData.index_type || 'auto'} onChange={handleChange}>
+                    <option value="auto">Auto (flat, HNSW for large collections)</option>
+                    <option value="flat">Flat (exact)</option>
+                    <option value="hnsw">HNSW</option>
+                    <option value="sq8">HNSW + 8-bit quantization (~4x smaller)</option>
+                    <option value="pq">Product quantization (smallest, approximate)</option>
+                </select>
+            </div>
         </div>
     );
 };
@@ -21,6 +21,7 @@ import {
     ArrowPathIcon,
     ArrowUturnLeftIcon,
     ChatBubbleBottomCenterTextIcon,
+    Squares2X2Icon,
 } from '@heroicons/react/24/outline';
 import AccordionItem from './AccordionItem';
 import VariableExplorer from './VariableExplorer';
@@ -59,6 +60,7 @@ const Sidebar = () => {
         { type: 'start_loop', label: 'Start Loop', icon: <ArrowPathIcon className="h-6 w-6 text-rose-700" /> },
         { type: 'end_loop', label: 'End Loop', icon: <ArrowUturnLeftIcon className="h-6 w-6 text-rose-700" /> },
         { type: 'display_message', label: 'Display Message', icon: <ChatBubbleBottomCenterTextIcon className="h-6 w-6 text-indigo-700" /> },
+        { type: 'parallel_group', label: 'Parallel Group', icon: <Squares2X2Icon className="h-6 w-6 text-violet-700" /> },
     ];
 
     const handleSaveWorkflow = async () => {
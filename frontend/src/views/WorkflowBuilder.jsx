@@ -36,6 +36,7 @@ import DirectToolCallNode from "../components/nodes/DirectToolCallNode";
 import StartLoopNode from "../components/nodes/StartLoopNode";
 import EndLoopNode from "../components/nodes/EndLoopNode";
 import DisplayMessageNode from '../components/nodes/DisplayMessageNode';
+import ParallelGroupNode from '../components/nodes/ParallelGroupNode';
 
 import useWorkflowStore from '../stores/workflowStore';
 
@@ -61,6 +62,7 @@ const nodeTypes = {
     start_loopNode: StartLoopNode,
     end_loopNode: EndLoopNode,
     display_messageNode: DisplayMessageNode,
+    parallel_groupNode: ParallelGroupNode,
 };
 
 const initialNodes = [
@@ -95,6 +97,7 @@ const nodeDefaultsFactory = (type) => {
         'start_loop': { input_collection_variable: '{input.my_list}', current_item_output_key: 'currentItem', output_key: 'loop_results' },
         'end_loop': { output_key: null, prompt_template: null, value_to_return: null },
         'display_message': { prompt_template: 'The value is {input.variable_name}.' },
+        'parallel_group': { prompt_template: null, output_key: null },
     };
 
     return { ...baseData, ...(specificData[type] || {}) };